@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pdf_chatbot.core.services.config import Config
+from pdf_services.vector_storage.corpus_version import CorpusVersion
+
+
+class AnswerCache:
+    """Semantic cache of generated answers, matched on the embedding of the rephrased query."""
+
+    def __init__(
+        self,
+        threshold: float = Config.ANSWER_CACHE_THRESHOLD,
+        max_entries: int = Config.ANSWER_CACHE_SIZE,
+        corpus_version: Optional[CorpusVersion] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.corpus_version = corpus_version or CorpusVersion()
+        self.hits = 0
+        self.misses = 0
+        self._version = self.corpus_version.get()
+        self._scopes: Dict[Tuple, OrderedDict] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, scope: Tuple, query_embedding: List[float]) -> Optional[Tuple[str, List[Dict]]]:
+        """Return the cached (response, sources) of the most similar earlier query, if similar enough."""
+        query_vector = self._normalize(query_embedding)
+        with self._lock:
+            self._check_corpus_version()
+            entries = self._scopes.get(scope)
+            if not entries:
+                self.misses += 1
+                return None
+
+            keys = list(entries.keys())
+            matrix = np.stack([entries[key][0] for key in keys])
+            similarities = matrix @ query_vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entries.move_to_end(keys[best])
+            self.hits += 1
+            _, response, sources = entries[keys[best]]
+            return response, sources
+
+    def store(self, scope: Tuple, query: str, query_embedding: List[float], response: str, sources: List[Dict]) -> None:
+        """Cache the answer for the query within the scope (model and filters)."""
+        query_vector = self._normalize(query_embedding)
+        with self._lock:
+            self._check_corpus_version()
+            entries = self._scopes.setdefault(scope, OrderedDict())
+            entries[query] = (query_vector, response, sources)
+            entries.move_to_end(query)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached answers."""
+        with self._lock:
+            self._scopes.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of cached answers."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": sum(len(entries) for entries in self._scopes.values()),
+                "corpus_version": self._version,
+            }
+
+    def _check_corpus_version(self) -> None:
+        """Invalidate all entries once documents were added or removed. Caller must hold the lock."""
+        version = self.corpus_version.get()
+        if version != self._version:
+            self._scopes.clear()
+            self._version = version
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Return the embedding as a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
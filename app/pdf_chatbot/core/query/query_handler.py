@@ -1,5 +1,7 @@
+import logging
 import os
 import re
+import time
 from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
@@ -7,8 +9,12 @@ from langdetect import detect
 from langchain_openai import ChatOpenAI
 
 from pdf_chatbot.core.conversation.conversation_manager import ConversationManager
-from pdf_chatbot.retriever.retrieval_pipeline import RetrievalPipeline
+from pdf_chatbot.core.services.config import Config
+from pdf_chatbot.retriever.pipeline_pool import RetrievalPipelinePool
 from pdf_chatbot.utils.translator import Translator
+from pdf_services.utils.blocking_executor import run_blocking
+
+logger = logging.getLogger(__name__)
 
 class PDFQuery(BaseModel):
     """Query for a PDF document."""
@@ -17,6 +23,9 @@ class PDFQuery(BaseModel):
     source: Optional[str] = None
     chat_history: Optional[List] = None
     filters: Optional[dict] = Field(default=None, description="Additional query filters")
+    stage_models: Optional[Dict[str, str]] = Field(
+        default=None, description="Per-stage model overrides, e.g. {'check': '4o-mini'}"
+    )
 
 
 class QueryHandler:
@@ -31,6 +40,7 @@ class QueryHandler:
             "o3-mini":ChatOpenAI(model_name="o3-mini", temperature=1),
         }
         self.translator = Translator()
+        self.pipeline_pool = RetrievalPipelinePool(llms=self.llms)
         
     def get_session_history(self, session_id: str) -> ConversationManager:
         """Retrieve or create a new ConversationManager for the session."""
@@ -43,14 +53,43 @@ class QueryHandler:
         if session_id in self.sessions:
             self.sessions[session_id].clear_history()
 
-    def handle_query(self, user_query: str, filters: Optional[dict], session_id: str, history=[], llm_model: str = "4o") -> tuple:
+    def _get_pipeline(self, filters: Optional[dict], llm_model: str) -> tuple:
+        """Return the pooled pipeline, the chat model and its name for the request."""
+        if llm_model not in self.llms:
+            llm_model = "4o"
+        model = self.llms[llm_model]
+        rag_pipeline = self.pipeline_pool.get_pipeline(llm_model, model, filters)
+        return rag_pipeline, model, llm_model
+
+    def _resolve_stage_models(self, llm_model: str, stage_models: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Merge the per-request overrides into Config.STAGE_MODELS, filling gaps with the selected model."""
+        resolved = {**Config.STAGE_MODELS, **(stage_models or {})}
+        return {
+            stage: model_name if model_name in self.llms else llm_model
+            for stage, model_name in resolved.items()
+        }
+
+    @staticmethod
+    def _needs_translation(user_query: str, response: str) -> Optional[str]:
+        """Return the language the response must be translated to, or None."""
+        target_language = detect(user_query)
+        is_no_response = re.fullmatch(
+            r"no-response\.?", response.strip(), re.IGNORECASE
+        )
+        if detect(response) != target_language and not is_no_response:
+            return target_language
+        return None
+
+    def handle_query(self, user_query: str, filters: Optional[dict], session_id: str, history=[], llm_model: str = "4o", stage_models: Optional[Dict[str, str]] = None) -> tuple:
         """Handle the user query and return the response."""
         conversation_manager = self.get_session_history(session_id)
         session_history = conversation_manager.get_history()
+        start_time = time.perf_counter()
         
-        model = self.llms.get(llm_model, "4o")
-        self.rag_pipeline = RetrievalPipeline(model_name=llm_model, model=model, filters=filters)
-        response, source = self.rag_pipeline.get_response(user_query, session_history)
+        rag_pipeline, model, llm_model = self._get_pipeline(filters, llm_model)
+        stage_models = self._resolve_stage_models(llm_model, stage_models)
+        response, source = rag_pipeline.get_response(user_query, session_history, stage_models)
+        self._log_latency(llm_model, stage_models, start_time)
         
         if response == "No-Response":
             return {
@@ -58,16 +97,80 @@ class QueryHandler:
             "source": "No source details available."
         }
         
-        target_language = detect(user_query)
-        is_no_response = re.fullmatch(
-            r"no-response\.?", response.strip(), re.IGNORECASE
-        )
-        if detect(response) != target_language and not is_no_response:
-            response = self.translator.translate_text(response, target_language, model, llm_model)
+        target_language = self._needs_translation(user_query, response)
+        if target_language:
+            translate_model = stage_models["final_translate"]
+            response = self.translator.translate_text(
+                response, target_language, self.llms[translate_model], translate_model
+            )
         
         conversation_manager.add_to_history(user_query=user_query, response=response)
         return self._format_source_details(response, source)
 
+    async def ahandle_query(self, user_query: str, filters: Optional[dict], session_id: str, history=[], llm_model: str = "4o", stage_models: Optional[Dict[str, str]] = None) -> dict:
+        """Async variant of `handle_query` built on the async retrieval pipeline."""
+        conversation_manager = self.get_session_history(session_id)
+        session_history = conversation_manager.get_history()
+        start_time = time.perf_counter()
+
+        rag_pipeline, model, llm_model = await run_blocking(self._get_pipeline, filters, llm_model)
+        stage_models = self._resolve_stage_models(llm_model, stage_models)
+        response, source = await rag_pipeline.aget_response(user_query, session_history, stage_models)
+        self._log_latency(llm_model, stage_models, start_time)
+
+        if response == "No-Response":
+            return {
+                "answer": response,
+                "source": "No source details available."
+            }
+
+        target_language = await run_blocking(self._needs_translation, user_query, response)
+        if target_language:
+            translate_model = stage_models["final_translate"]
+            response = await self.translator.atranslate_text(
+                response, target_language, self.llms[translate_model], translate_model
+            )
+
+        conversation_manager.add_to_history(user_query=user_query, response=response)
+        return self._format_source_details(response, source)
+
+    async def astream_query(self, user_query: str, filters: Optional[dict], session_id: str, llm_model: str = "4o", stage_models: Optional[Dict[str, str]] = None):
+        """Stream the answer tokens, then yield the final formatted response."""
+        conversation_manager = self.get_session_history(session_id)
+        session_history = conversation_manager.get_history()
+
+        rag_pipeline, model, llm_model = await run_blocking(self._get_pipeline, filters, llm_model)
+        stage_models = self._resolve_stage_models(llm_model, stage_models)
+        async for event, data in rag_pipeline.astream_response(user_query, session_history, stage_models):
+            if event == "token":
+                yield event, data
+                continue
+
+            response, source = data
+            if response == "No-Response":
+                yield "final", {
+                    "answer": response,
+                    "source": "No source details available."
+                }
+                return
+
+            target_language = await run_blocking(self._needs_translation, user_query, response)
+            if target_language:
+                translate_model = stage_models["final_translate"]
+                response = await self.translator.atranslate_text(
+                    response, target_language, self.llms[translate_model], translate_model
+                )
+
+            conversation_manager.add_to_history(user_query=user_query, response=response)
+            yield "final", self._format_source_details(response, source)
+
+    @staticmethod
+    def _log_latency(llm_model: str, stage_models: Dict[str, str], start_time: float):
+        """Log the pipeline latency together with the model used for each stage."""
+        logger.info(
+            "RAG pipeline for '%s' took %.2fs (stage models: %s)",
+            llm_model, time.perf_counter() - start_time, stage_models,
+        )
 
     def _format_source_details(self, response: str, sources: List[Dict]) -> dict:
         """Formats the response and associated source details."""
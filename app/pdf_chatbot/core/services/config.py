@@ -5,6 +5,91 @@ class Config:
     PDF_FOLDER = "data/uploaded_pdfs"
     DEST_FOLDER = "data/all_processed_pdfs"
     DOWNLOAD_FOLDER = "data/scholarly_downloaded_pdfs"
+
+    # Maximum number of long-lived RetrievalPipeline instances (keyed by model and filters)
+    PIPELINE_POOL_SIZE = 32
+
+    # Number of threads used to run the per-query vector searches in parallel
+    SEARCH_WORKERS = 4
+
+    # Adaptive top-k: fetch ADAPTIVE_CANDIDATE_K candidates per query once, then keep between
+    # ADAPTIVE_MIN_K and ADAPTIVE_MAX_K of them, cutting below ADAPTIVE_MIN_RELEVANCE (cosine)
+    # or at the first score drop larger than ADAPTIVE_MAX_SCORE_GAP.
+    # When disabled, the fixed k=1 (no filters) / k=10 (filters) is used.
+    ADAPTIVE_TOP_K = True
+    ADAPTIVE_CANDIDATE_K = 20
+    ADAPTIVE_MIN_K = 2
+    ADAPTIVE_MAX_K = 8
+    ADAPTIVE_MIN_RELEVANCE = 0.3
+    ADAPTIVE_MAX_SCORE_GAP = 0.08
+
+    # Two-level retrieval: first pick the TWO_LEVEL_TOP_PAPERS PDFs whose centroid vectors are
+    # closest to the query, then search chunks only within those PDFs. The centroid index is
+    # maintained during ingestion; backfill an existing store with
+    # `python -m pdf_services.vector_storage.centroid_index` before enabling.
+    TWO_LEVEL_RETRIEVAL = False
+    TWO_LEVEL_TOP_PAPERS = 5
+
+    # Search the per-year collections overlapping the year filter instead of the single
+    # collection. Must match YEAR_PARTITIONED in pdf_services/config/settings.py.
+    YEAR_PARTITIONED = False
+
+    # Two-stage vector search: the ANN index holds REDUCED_DIMENSIONS-dim vectors and the
+    # RERANK_CANDIDATE_K best candidates are rescored against the full vectors in FULL_VECTORS_PATH.
+    # Must match REDUCED_DIMENSIONS in pdf_services/config/settings.py (None disables it).
+    REDUCED_DIMENSIONS = None
+    RERANK_CANDIDATE_K = 50
+    FULL_VECTORS_PATH = "data/full_vectors"
+
+    # Serve retrieval from an exported read-only snapshot (e.g. "data/vector_snapshot") with exact
+    # in-process search instead of opening the Chroma store. None uses Chroma.
+    SNAPSHOT_PATH = None
+
+    # Lexical (BM25) search fused with the dense results by reciprocal rank fusion. When the best
+    # lexical hit contains LEXICAL_STRONG_COVERAGE of the query terms (stopwords excluded) and scores
+    # at least LEXICAL_STRONG_GAP times the runner-up, the translation and multi-query LLM calls are
+    # skipped. BM25 scores depend on corpus size and query length, so only their ratio is compared.
+    LEXICAL_SEARCH = True
+    LEXICAL_INDEX_PATH = "data/lexical_index.sqlite3"
+    LEXICAL_TOP_K = 10
+    LEXICAL_STRONG_GAP = 1.5
+    LEXICAL_STRONG_COVERAGE = 1.0
+    RRF_K = 60
+
+    # The index holds translated twins of every chunk (BILINGUAL_TWINS in pdf_services/config/settings.py),
+    # so the per-query translation call is skipped and twin hits are mapped back to their originals
+    BILINGUAL_INDEX = False
+
+    # Hashes of the ingested PDFs (PDF_REGISTRY_PATH in pdf_services/config/settings.py),
+    # cleaned up when a PDF is deleted
+    PDF_REGISTRY_PATH = "data/pdf_registry.sqlite3"
+
+    # Semantic answer cache: cosine similarity of the rephrased query needed for a hit
+    ANSWER_CACHE_ENABLED = True
+    ANSWER_CACHE_THRESHOLD = 0.95
+    ANSWER_CACHE_SIZE = 256  # Maximum number of answers kept per model and filters
+
+    # Model used for each pipeline stage. None means the model selected by the user (llm_model).
+    # Individual stages can be overridden per request via PDFQuery.stage_models.
+    STAGE_MODELS = {
+        "rephrase": "4o-mini",
+        "translate": "4o-mini",
+        "multi_query": "4o-mini",
+        "answer": None,
+        "check": "4o-mini",
+        "final_translate": "4o-mini",
+    }
+
+    # Generate the answer and the answered flag in one structured-output call instead of a
+    # separate _check_response call. Set to False to compare against the two-call mode.
+    STRUCTURED_ANSWER = True
+    STRUCTURED_OUTPUT_UNSUPPORTED_MODELS = ["o1", "o1-mini"]
+
+    # Prompt context assembly: token budget for the retrieved chunks, tiktoken encoding
+    # and the word-shingle similarity above which a chunk counts as a near-duplicate
+    CONTEXT_TOKEN_BUDGET = 6000
+    CONTEXT_ENCODING = "o200k_base"
+    CONTEXT_DUPLICATE_THRESHOLD = 0.9
     
     os.makedirs(DEST_FOLDER, exist_ok=True)
     os.makedirs(PDF_FOLDER, exist_ok=True)
@@ -6,6 +6,7 @@ import shutil
 from urllib.parse import quote
 from pdf_chatbot.utils.remove import RemovePDF
 from pdf_chatbot.core.services.config import Config
+from pdf_services.utils.blocking_executor import run_blocking
 
 
 class PdfCoreServices:
@@ -101,3 +102,26 @@ class PdfCoreServices:
             if pdf.name not in selected_pdfs:
                 os.remove(pdf)
         return {"message": "Unselected PDFs deleted"}
+
+    # Async variants: the blocking file system and ChromaDB work runs on the
+    # bounded executor so the event loop keeps serving other requests.
+    async def alist_pdfs(self):
+        return await run_blocking(self.list_pdfs)
+
+    async def aget_pdf(self, pdf_name: str):
+        return await run_blocking(self.get_pdf, pdf_name)
+
+    async def adelete_pdf(self, pdf_name: str):
+        return await run_blocking(self.delete_pdf, pdf_name)
+
+    async def aclear_pdf_folder(self, folder_path: str = Config.DOWNLOAD_FOLDER):
+        return await run_blocking(self.clear_pdf_folder, folder_path)
+
+    async def alist_downloaded_pdfs(self):
+        return await run_blocking(self.list_downloaded_pdfs)
+
+    async def aget_downloaded_pdf(self, pdf_name: str):
+        return await run_blocking(self.get_downloaded_pdf, pdf_name)
+
+    async def adelete_unselected_pdfs(self, selected_pdfs: list[str]):
+        return await run_blocking(self.delete_unselected_pdfs, selected_pdfs)
@@ -0,0 +1,93 @@
+import os
+import re
+from typing import List, Optional, Set
+
+import tiktoken
+
+from pdf_chatbot.core.services.config import Config
+
+
+class ContextBuilder:
+    """Assembles the prompt context from retrieved chunks within a token budget."""
+
+    def __init__(
+        self,
+        token_budget: int = Config.CONTEXT_TOKEN_BUDGET,
+        encoding_name: str = Config.CONTEXT_ENCODING,
+        duplicate_threshold: float = Config.CONTEXT_DUPLICATE_THRESHOLD,
+    ):
+        self.token_budget = token_budget
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.duplicate_threshold = duplicate_threshold
+
+    def build(self, docs: List) -> str:
+        """Return the context text for the documents (or (document, score) pairs).
+
+        Chunks are added in score order with only their page content and a short
+        source tag. Near-duplicates are dropped, and chunks that no longer fit in
+        the token budget are skipped.
+        """
+        entries = []
+        kept_shingles: List[Set[str]] = []
+        used_tokens = 0
+
+        for doc in self._sort_by_score(docs):
+            text = re.sub(r"\s+", " ", doc.page_content).strip()
+            if not text:
+                continue
+
+            shingles = self._shingles(text)
+            if any(self._jaccard(shingles, kept) >= self.duplicate_threshold for kept in kept_shingles):
+                continue
+
+            entry = f"[{len(entries) + 1}] ({self._source_tag(doc)}) {text}"
+            tokens = self.encoding.encode(entry)
+            if used_tokens + len(tokens) > self.token_budget:
+                if entries:
+                    continue
+                # Always keep (a truncated version of) the best chunk
+                tokens = tokens[: self.token_budget]
+                entry = self.encoding.decode(tokens)
+
+            entries.append(entry)
+            kept_shingles.append(shingles)
+            used_tokens += len(tokens)
+
+        return "\n\n".join(entries)
+
+    def count_tokens(self, text: str) -> int:
+        """Return the number of tokens of the text."""
+        return len(self.encoding.encode(text))
+
+    @staticmethod
+    def _sort_by_score(docs: List) -> List:
+        """Return the documents ordered by descending score, keeping the order of unscored input."""
+        if docs and isinstance(docs[0], tuple):
+            return [doc for doc, _ in sorted(docs, key=lambda pair: pair[1], reverse=True)]
+        return list(docs)
+
+    @staticmethod
+    def _source_tag(doc) -> str:
+        """Return a short source tag such as 'Title, 2021'."""
+        title: Optional[str] = doc.metadata.get("title")
+        if not title:
+            title = os.path.basename(str(doc.metadata.get("source", "Unknown")).replace("\\", "/"))
+        year = doc.metadata.get("year")
+        if year and year != "Unknown":
+            return f"{title}, {year}"
+        return title
+
+    @staticmethod
+    def _shingles(text: str, size: int = 5) -> Set[str]:
+        """Return the set of word n-grams used for near-duplicate detection."""
+        words = text.lower().split()
+        if len(words) <= size:
+            return {" ".join(words)}
+        return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+    @staticmethod
+    def _jaccard(first: Set[str], second: Set[str]) -> float:
+        """Return the Jaccard similarity of two shingle sets."""
+        if not first or not second:
+            return 0.0
+        return len(first & second) / len(first | second)
@@ -1,11 +1,26 @@
-import math
+import logging
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List
 
-from sklearn.metrics.pairwise import cosine_similarity
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.documents import Document
+from pdf_chatbot.core.services.config import Config
+from pdf_services.vector_storage.cached_embeddings import CachedEmbeddings
+from pdf_services.vector_storage.centroid_index import CentroidIndex
+from pdf_services.vector_storage.full_vector_store import FullVectorStore
+from pdf_services.vector_storage.lexical_index import LexicalIndex
+from pdf_services.vector_storage.reduced_embeddings import ReducedEmbeddings
+from pdf_services.vector_storage.snapshot import VectorSnapshot
+from pdf_services.vector_storage.year_partitions import YearPartitions
+
+logger = logging.getLogger(__name__)
+
+# Shared by all retrievers, so pooled instances that are evicted don't leave idle threads behind
+SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=Config.SEARCH_WORKERS, thread_name_prefix="vector-search")
+# Partition fan-out runs inside SEARCH_EXECUTOR tasks; waiting on the same pool from its own workers could deadlock
+PARTITION_EXECUTOR = ThreadPoolExecutor(max_workers=Config.SEARCH_WORKERS, thread_name_prefix="partition-search")
 
 
 class MultiVectorRetriever:
@@ -14,27 +29,56 @@ class MultiVectorRetriever:
         self,
         model_name="text-embedding-3-large",
         collection_name="multi_modal_rag",
-        persist_directory="data/pdf_embeddings",
+        persist_directory=Config.CHROMA_PATH,
         filters=None,
     ):
-        self.embedding_model = OpenAIEmbeddings(model=model_name)
+        self.embedding_model = CachedEmbeddings.shared(model_name)
+        self.persist_directory = persist_directory
+        self.filters = filters
+        self.search_executor = SEARCH_EXECUTOR
+        self.snapshot = None
+        self.full_vectors = None
+        self.index_embedding_model = self.embedding_model
+        self.centroid_index = None
+        self.partitions = None
+        self._partition_stores = {}
+        self.lexical_index = LexicalIndex(Config.LEXICAL_INDEX_PATH) if Config.LEXICAL_SEARCH else None
+
+        if Config.SNAPSHOT_PATH and VectorSnapshot.exists(Config.SNAPSHOT_PATH):
+            # Serve from the read-only snapshot; the Chroma store is not opened at all
+            self.snapshot = VectorSnapshot.shared(Config.SNAPSHOT_PATH)
+            self.vectorstore = None
+            self.retriever = None
+            return
+        if Config.SNAPSHOT_PATH:
+            logger.warning("No vector snapshot exported to %s yet, serving from Chroma", Config.SNAPSHOT_PATH)
+
+        if Config.REDUCED_DIMENSIONS:
+            # The index holds reduced vectors; candidates are rescored against the full ones
+            self.index_embedding_model = ReducedEmbeddings(self.embedding_model, Config.REDUCED_DIMENSIONS)
+            self.full_vectors = FullVectorStore(Config.FULL_VECTORS_PATH)
         self.vectorstore = Chroma(
             collection_name=collection_name,
-            embedding_function=self.embedding_model,
+            embedding_function=self.index_embedding_model,
             persist_directory=persist_directory,
         )
-        self.filters = filters
         self.retriever = self.retrieve_retriever(filters=self.filters)
+        if Config.TWO_LEVEL_RETRIEVAL:
+            self.centroid_index = CentroidIndex(persist_directory)
+        if Config.YEAR_PARTITIONED:
+            self.partitions = YearPartitions(persist_directory, collection_name)
     
     
-    def retrieve_retriever(self, filters=None):
-        """Return the retriever based on the filters."""
+    @property
+    def search_kwargs(self) -> dict:
+        """Search arguments for the retriever's filters, rebuilt per search so "pastYears" follows the current year."""
+        return self.build_search_kwargs(filters=self.filters)
+
+    def build_filter_condition(self, filters=None):
+        """Return the Chroma `where` condition for the filters, or None if nothing is filtered."""
         if not filters:
-            # If no filters are provided, return the default retriever
-            return self.vectorstore.as_retriever(
-                search_type="similarity", search_kwargs={"k": 1}
-            )
-            
+            return None
+
         filter_condition = {}
         
         # Handle the 'year' filter
@@ -65,44 +109,327 @@ class MultiVectorRetriever:
                 ]
             }
 
+        return filter_condition or None
+
+    def year_range(self, filters=None):
+        """Return the (start_year, end_year) selected by the filters, or None if years are not filtered."""
+        if not filters:
+            return None
+        try:
+            if "year" in filters:
+                return int(filters["year"]), int(filters["year"])
+            if "yearRange" in filters:
+                start_year = filters["yearRange"].get("startYear")
+                end_year = filters["yearRange"].get("endYear")
+                if start_year and end_year:
+                    return int(start_year), int(end_year)
+            if "pastYears" in filters:
+                current_year = datetime.now().year
+                return current_year - int(filters["pastYears"]) + 1, current_year
+        except (TypeError, ValueError):
+            pass
+        return None
+
+    def get_search_stores(self) -> List[Chroma]:
+        """Return the collections to search: the single collection, or the year partitions overlapping the filters.
+
+        While the single collection still holds chunks (YEAR_PARTITIONED is set but `year_partitions.migrate`
+        has not run yet), it is searched next to the partitions so the un-migrated corpus stays retrievable.
+        """
+        if self.partitions is None:
+            return [self.vectorstore]
+        stores = []
+        if self.vectorstore._collection.count() > 0:
+            stores.append(self.vectorstore)
+        partitions = self.partitions.list_partitions()
+        if not partitions:
+            logger.warning("YEAR_PARTITIONED is set but no year partitions exist, searching the single collection")
+            return [self.vectorstore]
+        for name in self.partitions.partitions_for_range(self.year_range(self.filters), partitions):
+            if name not in self._partition_stores:
+                self._partition_stores[name] = Chroma(
+                    collection_name=name,
+                    embedding_function=self.index_embedding_model,
+                    persist_directory=self.persist_directory,
+                )
+            stores.append(self._partition_stores[name])
+        return stores
+
+    def build_search_kwargs(self, filters=None):
+        """Return the search arguments (k and filter) based on the filters."""
+        if Config.ADAPTIVE_TOP_K:
+            # Fetch a larger candidate set once; `cut_adaptive` keeps the relevant head
+            return {"k": Config.ADAPTIVE_CANDIDATE_K, "filter": self.build_filter_condition(filters)}
+        if not filters:
+            # If no filters are provided, use the default search
+            return {"k": 1}
+        return {"k": 10, "filter": self.build_filter_condition(filters)}
+
+    @staticmethod
+    def cut_adaptive(
+        scored_docs,
+        min_k: int = Config.ADAPTIVE_MIN_K,
+        max_k: int = Config.ADAPTIVE_MAX_K,
+        min_relevance: float = Config.ADAPTIVE_MIN_RELEVANCE,
+        max_score_gap: float = Config.ADAPTIVE_MAX_SCORE_GAP,
+    ):
+        """Cut a ranked list of (document, relevance) pairs where relevance ends.
+
+        Keeps at least `min_k` and at most `max_k` results, and stops at the first result
+        below `min_relevance` or more than `max_score_gap` below its predecessor.
+        """
+        scored_docs = sorted(scored_docs, key=lambda pair: pair[1], reverse=True)
+        kept = []
+        for doc, score in scored_docs:
+            if len(kept) >= max_k:
+                break
+            if len(kept) >= min_k and (
+                score < min_relevance or kept[-1][1] - score > max_score_gap
+            ):
+                break
+            kept.append((doc, score))
+        return kept
+
+    def retrieve_retriever(self, filters=None):
+        """Return the retriever based on the filters."""
         return self.vectorstore.as_retriever(
-            search_type="similarity",
-            search_kwargs={"k": 10, "filter": filter_condition}
+            search_type="similarity", search_kwargs=self.build_search_kwargs(filters)
         )
+
+    @staticmethod
+    def distance_to_relevance(distance: float) -> float:
+        """Convert a Chroma distance to a cosine similarity.
+
+        The collection uses Chroma's default squared L2 space and OpenAI embeddings are
+        unit-length, so the squared distance equals 2 - 2 * cosine similarity.
+        """
+        return 1.0 - distance / 2.0
+
+    def _search_by_vector(self, embedding):
+        """Search with a precomputed query embedding, returning (document, relevance) pairs."""
+        if self.snapshot is not None:
+            scored_docs = self.snapshot.search(
+                embedding, self.search_kwargs["k"], self.year_range(self.filters)
+            )
+        else:
+            scored_docs = self._search_chroma(embedding)
+        if Config.BILINGUAL_INDEX:
+            scored_docs = self.resolve_twins(scored_docs)
+        if Config.ADAPTIVE_TOP_K:
+            return self.cut_adaptive(scored_docs)
+        return scored_docs
+
+    def _search_chroma(self, embedding):
+        """Search the Chroma collections, returning (document, relevance) pairs."""
+        k = self.search_kwargs["k"]
+        index_embedding = embedding
+        if self.full_vectors is not None:
+            index_embedding = ReducedEmbeddings.reduce([embedding], Config.REDUCED_DIMENSIONS)[0].tolist()
+
+        search_kwargs = self._paper_search_kwargs(index_embedding)
+        if self.full_vectors is not None:
+            search_kwargs = {**search_kwargs, "k": max(k, Config.RERANK_CANDIDATE_K)}
+
+        stores = self.get_search_stores()
+        if len(stores) == 1:
+            results = stores[0].similarity_search_by_vector_with_relevance_scores(
+                index_embedding, **search_kwargs
+            )
+        else:
+            # Fan out over the year partitions in parallel and merge by distance
+            results = [
+                pair
+                for store_results in PARTITION_EXECUTOR.map(
+                    lambda store: store.similarity_search_by_vector_with_relevance_scores(
+                        index_embedding, **search_kwargs
+                    ),
+                    stores,
+                )
+                for pair in store_results
+            ]
+            results = sorted(results, key=lambda pair: pair[1])[: search_kwargs["k"]]
+        scored_docs = [(doc, self.distance_to_relevance(distance)) for doc, distance in results]
+        if self.full_vectors is not None:
+            scored_docs = self.rescore_with_full_vectors(embedding, scored_docs)[:k]
+        return scored_docs
+
+    def rescore_with_full_vectors(self, query_embedding, scored_docs):
+        """Replace the relevance of the (document, relevance) candidates by the exact full-dimension cosine similarity.
+
+        Candidates without a stored full vector keep their index relevance.
+        """
+        if not scored_docs:
+            return []
+        full_vectors = self.full_vectors.get([doc.id for doc, _ in scored_docs if getattr(doc, "id", None)])
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_vector = query_vector / (np.linalg.norm(query_vector) or 1)
+
+        rescored = []
+        for doc, score in scored_docs:
+            vector = full_vectors.get(getattr(doc, "id", None))
+            if vector is not None:
+                score = float(vector @ query_vector / (np.linalg.norm(vector) or 1))
+            rescored.append((doc, score))
+        return sorted(rescored, key=lambda pair: pair[1], reverse=True)
+
+    def _paper_search_kwargs(self, embedding):
+        """Return the search arguments, restricted to the closest PDFs when two-level retrieval is enabled."""
+        if self.centroid_index is None:
+            return self.search_kwargs
+
+        filter_condition = self.search_kwargs.get("filter")
+        titles = self.centroid_index.top_titles(
+            embedding, Config.TWO_LEVEL_TOP_PAPERS, where=filter_condition
+        )
+        if not titles:
+            # No centroids yet (index not backfilled): search the whole collection
+            return self.search_kwargs
+
+        title_condition = {"title": {"$in": titles}}
+        if filter_condition:
+            title_condition = {"$and": [filter_condition, title_condition]}
+        return {**self.search_kwargs, "filter": title_condition}
+
+    def search_by_queries(self, queries: List[str]) -> List[List]:
+        """Embed all queries in one batched request and run the searches in parallel."""
+        if not queries:
+            return []
+        query_embeddings = self.embedding_model.embed_documents(list(queries))
+        return list(self.search_executor.map(self._search_by_vector, query_embeddings))
     
+    def lexical_search(self, query: str):
+        """Return the BM25 (document, score) pairs for the query within the filtered years."""
+        if self.lexical_index is None:
+            return []
+        lexical_docs = self.lexical_index.search(query, Config.LEXICAL_TOP_K, self.year_range(self.filters))
+        if Config.BILINGUAL_INDEX:
+            return self.resolve_twins(lexical_docs)
+        return lexical_docs
+
+    @staticmethod
+    def resolve_twins(scored_docs):
+        """Replace translated twins by their original chunk, keeping the best score per original."""
+        resolved = {}
+        for doc, score in scored_docs:
+            original_id = doc.metadata.get("twin_of")
+            if original_id:
+                metadata = {
+                    key: value
+                    for key, value in doc.metadata.items()
+                    if key not in ("twin_of", "language", "original_text")
+                }
+                metadata["id"] = original_id
+                doc = Document(
+                    id=original_id,
+                    page_content=doc.metadata.get("original_text", doc.page_content),
+                    metadata=metadata,
+                )
+            key = doc.id or doc.page_content
+            if key not in resolved or score > resolved[key][1]:
+                resolved[key] = (doc, score)
+        return sorted(resolved.values(), key=lambda pair: pair[1], reverse=True)
+
+    @staticmethod
+    def is_strong_lexical_match(query: str, lexical_docs) -> bool:
+        """Return True if the best lexical hit contains the query terms and clearly outscores the runner-up."""
+        if not lexical_docs:
+            return False
+        doc, score = lexical_docs[0]
+        if len(lexical_docs) > 1 and score < Config.LEXICAL_STRONG_GAP * lexical_docs[1][1]:
+            return False
+        terms = set(LexicalIndex.query_terms(query))
+        covered = terms & set(LexicalIndex.tokenize(doc.page_content))
+        return len(covered) >= Config.LEXICAL_STRONG_COVERAGE * len(terms)
+
+    @staticmethod
+    def fuse_rankings(rankings, k: int = Config.RRF_K):
+        """Fuse ranked lists of (document, score) pairs with reciprocal rank fusion.
+
+        Documents are matched on their page content. Returns (document, fused score) pairs, best
+        first, with the fused score divided by its maximum so it lies in [0, 1].
+        """
+        rankings = [ranking for ranking in rankings if ranking]
+        if not rankings:
+            return []
+        fused_scores = {}
+        docs = {}
+        for ranking in rankings:
+            seen = set()
+            ranked = sorted(ranking, key=lambda pair: pair[1], reverse=True)
+            for rank, (doc, _) in enumerate(ranked, start=1):
+                content = doc.page_content
+                if content in seen:
+                    continue
+                seen.add(content)
+                fused_scores[content] = fused_scores.get(content, 0.0) + 1.0 / (k + rank)
+                docs.setdefault(content, doc)
+
+        max_score = len(rankings) / (k + 1)
+        return sorted(
+            ((docs[content], score / max_score) for content, score in fused_scores.items()),
+            key=lambda pair: pair[1],
+            reverse=True,
+        )
+
     def re_rank_docs_based_on_recency(self, docs, alpha=0, lambda_=0.01):
-        """Re-rank the search results based on the similarity score and time decay."""
-        def compute_time_weight(chunk_year, current_year=None):
-            if current_year is None:
-                current_year = datetime.now().year
-            age = current_year - chunk_year
-            return math.exp(-lambda_ * age)
-    
+        """Re-rank the (document, similarity) pairs based on the similarity score and time decay."""
+        if not docs:
+            return []
         current_year = datetime.now().year
-        scored_docs = []
-    
-        for doc in docs:
-            year = doc.metadata.get('year', current_year)
-            time_weight = compute_time_weight(year, current_year)
-            similarity_score = doc.score if hasattr(doc, 'score') else 1
-            final_score = alpha * similarity_score + (1 - alpha) * time_weight
-            scored_docs.append((doc, final_score))
-    
-        scored_docs = sorted(scored_docs, key=lambda x: x[1], reverse=True)
-        return scored_docs
+        documents = [doc for doc, _ in docs]
+        similarity_scores = np.array([score for _, score in docs], dtype=np.float64)
+        years = np.array(
+            [self._year_or_default(doc.metadata.get("year"), current_year) for doc in documents],
+            dtype=np.float64,
+        )
+
+        time_weights = np.exp(-lambda_ * (current_year - years))
+        final_scores = alpha * similarity_scores + (1 - alpha) * time_weights
+        order = np.argsort(-final_scores, kind="stable")
+        return [(documents[i], float(final_scores[i])) for i in order]
+
+    @staticmethod
+    def _year_or_default(year, default: int) -> int:
+        """Return the year as an int, or the default for missing or unknown years."""
+        try:
+            return int(year)
+        except (TypeError, ValueError):
+            return default
     
+    def get_stored_embeddings(self, docs) -> List:
+        """Fetch the stored vectors of the documents from the collection by id (None if unavailable)."""
+        ids = list({doc.id for doc in docs if getattr(doc, "id", None)})
+        stored = {}
+        if ids and self.snapshot is not None:
+            stored = self.snapshot.get_embeddings(ids)
+        elif ids and self.full_vectors is not None:
+            stored = self.full_vectors.get(ids)
+        elif ids:
+            for store in self.get_search_stores():
+                result = store.get(ids=ids, include=["embeddings"])
+                stored.update(zip(result["ids"], result["embeddings"]))
+        return [stored.get(getattr(doc, "id", None)) for doc in docs]
+
     def re_rank_chunks_with_response(self, response, chunks):
-        """Re-ranking the chunks based on the cosine similarity between the response and the chunk content."""
-        response_embedding = self.embedding_model.embed_query(response)
-        if self.filters and "alpha" in self.filters:
-            chunk_embeddings = self.embedding_model.embed_documents([chunk.page_content for chunk, score in chunks])
-        else:   
-            chunk_embeddings = self.embedding_model.embed_documents([chunk.page_content for chunk in chunks])
-        scores = [
-            cosine_similarity([response_embedding], [chunk_embedding])[0][0]
-            for chunk_embedding in chunk_embeddings
-        ]
-        return sorted(zip(chunks, scores), key=lambda x: x[1], reverse=True)
+        """Re-ranking the (chunk, score) pairs based on the cosine similarity between the response and the chunk content."""
+        if not chunks:
+            return []
+        docs = [chunk for chunk, _ in chunks]
+
+        response_embedding = np.asarray(self.embedding_model.embed_query(response), dtype=np.float32)
+
+        # Reuse the vectors stored in Chroma; only embed chunks that have none
+        chunk_embeddings = self.get_stored_embeddings(docs)
+        missing = [i for i, embedding in enumerate(chunk_embeddings) if embedding is None]
+        if missing:
+            embedded = self.embedding_model.embed_documents([docs[i].page_content for i in missing])
+            for i, embedding in zip(missing, embedded):
+                chunk_embeddings[i] = embedding
+
+        chunk_matrix = np.asarray(chunk_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(chunk_matrix, axis=1) * np.linalg.norm(response_embedding)
+        scores = (chunk_matrix @ response_embedding) / np.where(norms == 0, 1, norms)
+        return sorted(zip(docs, scores.tolist()), key=lambda x: x[1], reverse=True)
 
     
     def filter_chunks_for_source(self, top_chunks: List[Dict]) -> List[Dict]:
@@ -0,0 +1,106 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from pdf_chatbot.core.cache.answer_cache import AnswerCache
+from pdf_chatbot.core.services.config import Config
+from pdf_chatbot.retriever.multivector_retriever import MultiVectorRetriever
+from pdf_chatbot.retriever.retrieval_pipeline import RetrievalPipeline
+
+
+class RetrievalPipelinePool:
+    """Keeps long-lived RetrievalPipeline and MultiVectorRetriever instances keyed by model and filters."""
+
+    def __init__(self, max_size: int = Config.PIPELINE_POOL_SIZE, llms: Optional[Dict] = None):
+        self.max_size = max_size
+        self.llms = llms
+        self.answer_cache = AnswerCache() if Config.ANSWER_CACHE_ENABLED else None
+        self._pipelines = OrderedDict()
+        self._retrievers = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize_filters(filters: Optional[Dict]) -> str:
+        """Return a canonical key for the filters, ignoring empty values and key order."""
+        if not filters:
+            return ""
+        cleaned = {
+            key: value
+            for key, value in filters.items()
+            if value is not None and value != "" and value != {} and value != []
+        }
+        if not cleaned:
+            return ""
+        return json.dumps(cleaned, sort_keys=True, default=str)
+
+    @staticmethod
+    def retriever_filters(filters: Optional[Dict]) -> Optional[Dict]:
+        """Return the filters that change what is retrieved; "alpha" only weights the recency re-ranking."""
+        if not filters:
+            return filters
+        return {key: value for key, value in filters.items() if key != "alpha"}
+
+    def get_retriever(self, filters: Optional[Dict]) -> MultiVectorRetriever:
+        """Return the shared retriever for the given filters, creating it on first use."""
+        filters_key = self.normalize_filters(self.retriever_filters(filters))
+        with self._lock:
+            retriever_instance = self._lookup(self._retrievers, filters_key)
+        if retriever_instance is not None:
+            return retriever_instance
+
+        # Opening the stores is slow, so build outside the lock and keep the first instance inserted
+        retriever_instance = MultiVectorRetriever(filters=json.loads(filters_key) if filters_key else None)
+        with self._lock:
+            return self._insert(self._retrievers, filters_key, retriever_instance)
+
+    def get_pipeline(self, model_name: str, model, filters: Optional[Dict]) -> RetrievalPipeline:
+        """Return the shared pipeline for the given model and filters, creating it on first use."""
+        filters_key = self.normalize_filters(filters)
+        key = (model_name, filters_key)
+        with self._lock:
+            pipeline = self._lookup(self._pipelines, key)
+        if pipeline is not None:
+            return pipeline
+
+        retriever_instance = self.get_retriever(filters)
+        pipeline = RetrievalPipeline(
+            model_name=model_name,
+            model=model,
+            filters=json.loads(filters_key) if filters_key else None,
+            retriever_instance=retriever_instance,
+            answer_cache=self.answer_cache,
+            cache_scope=key,
+            llms=self.llms,
+        )
+        with self._lock:
+            return self._insert(self._pipelines, key, pipeline)
+
+    def clear(self):
+        """Drop all pooled instances, e.g. after the vector store was rebuilt."""
+        with self._lock:
+            self._pipelines.clear()
+            self._retrievers.clear()
+
+    @staticmethod
+    def _lookup(entries: OrderedDict, key):
+        """Return the entry for the key and mark it recently used, or None. Caller must hold the lock."""
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+        return entry
+
+    def _insert(self, entries: OrderedDict, key, entry):
+        """Insert a newly built entry unless another thread inserted one first, and return the
+        entry that is kept. Caller must hold the lock."""
+        existing = self._lookup(entries, key)
+        if existing is not None:
+            return existing
+        entries[key] = entry
+        self._evict(entries)
+        return entry
+
+    def _evict(self, entries: OrderedDict):
+        """Remove the least recently used entries above the pool size."""
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 from typing import Dict, List, Optional, Tuple
@@ -7,13 +8,25 @@ from annotated_types import doc
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langdetect import detect
+from pdf_chatbot.core.cache.answer_cache import AnswerCache
+from pdf_chatbot.core.services.config import Config
+from pdf_chatbot.retriever.context_builder import ContextBuilder
 from pdf_chatbot.retriever.multivector_retriever import MultiVectorRetriever
 from pdf_chatbot.utils.translator import Translator
+from pdf_services.utils.blocking_executor import run_blocking
 from pydantic import BaseModel, Field
 
 OPENAI_MODELS = ["4o", "4o-mini", "o1", "o1-mini", "o3-mini"]
 
 
+class RagAnswer(BaseModel):
+    """Structured RAG response: the answer and whether the context could answer the question."""
+    answer: str = Field(description="The answer to the question based on the context")
+    answered: bool = Field(
+        description="True if the answer provides relevant information for the question, otherwise False"
+    )
+
+
 class RetrievalPipeline:
     """Encapsulates the RAG pipeline, including model initialization, context retrieval, and response generation."""
 
@@ -22,20 +35,28 @@ class RetrievalPipeline:
         model_name: str = "4o",
         model="",
         filters: Optional[Dict] = None,
+        retriever_instance: Optional[MultiVectorRetriever] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        cache_scope: Optional[Tuple] = None,
+        llms: Optional[Dict] = None,
     ):
         self.model_name = model_name
         self.model = model
+        self.llms = llms or {model_name: model}
         self.filters = filters
-        self.retriever_instance = MultiVectorRetriever(filters=filters)
+        self.answer_cache = answer_cache
+        self.cache_scope = cache_scope or (model_name, json.dumps(filters, sort_keys=True, default=str))
+        self.retriever_instance = retriever_instance or MultiVectorRetriever(filters=filters)
         self.retriever = self.retriever_instance.retriever
         self.re_rank_docs_based_on_recency = (
             self.retriever_instance.re_rank_docs_based_on_recency
         )
         self.filter_chunks_for_source = self.retriever_instance.filter_chunks_for_source
         self.translator = Translator()
+        self.context_builder = ContextBuilder()
 
-    def _rephrase_query(self, query, history):
-        """Rephrases user query based on chat history."""
+    def _rephrase_chain(self, model=None):
+        """Builds the chain that rephrases a user query based on chat history."""
         template = """
         Refine the user query based on the chat history:  
 
@@ -53,15 +74,24 @@ class RetrievalPipeline:
         """
 
         rephrase_prompt = ChatPromptTemplate.from_template(template)
-        prompt_input = rephrase_prompt.format(query=query, chat_history=history)
-        rephrase_chain = rephrase_prompt | self.model
-        rephrased_query = rephrase_chain.invoke(
+        return rephrase_prompt | (model or self.model)
+
+    def _rephrase_query(self, query, history, model=None):
+        """Rephrases user query based on chat history."""
+        rephrased_query = self._rephrase_chain(model).invoke(
             {"query": query, "chat_history": history}
         )
         return "ok", rephrased_query.content
 
-    def _generate_multi_queries(self, question):
-        """Generates multiple variations of a query for retrieval."""
+    async def _arephrase_query(self, query, history, model=None):
+        """Async variant of `_rephrase_query`."""
+        rephrased_query = await self._rephrase_chain(model).ainvoke(
+            {"query": query, "chat_history": history}
+        )
+        return "ok", rephrased_query.content
+
+    def _multi_query_chain(self, model=None):
+        """Builds the chain that generates alternative versions of a query."""
         template = """
         Your task is to generate one different version of the given user question for better vector store retrieval.
         Provide exactly one alternative query, separated by newlines, without any additional comments or explanations.
@@ -73,36 +103,75 @@ class RetrievalPipeline:
         """
 
         multi_query_prompt = ChatPromptTemplate.from_template(template)
-        prompt_input = multi_query_prompt.format(question=question)
-        chain = multi_query_prompt | self.model
-        output = chain.invoke({"question": question})
+        return multi_query_prompt | (model or self.model)
+
+    def _generate_multi_queries(self, question, model=None):
+        """Generates multiple variations of a query for retrieval."""
+        output = self._multi_query_chain(model).invoke({"question": question})
+        return "ok", output.content.split("\n")
+
+    async def _agenerate_multi_queries(self, question, model=None):
+        """Async variant of `_generate_multi_queries`."""
+        output = await self._multi_query_chain(model).ainvoke({"question": question})
         return "ok", output.content.split("\n")
 
     def get_unique_union(self, documents):
-        """Returns a unique union of retrieved documents."""
-        flattened_docs = [doc for sublist in documents for doc in sublist]
-    
-        seen_contents = set()
-        unique_docs = []
-    
-        for doc in flattened_docs:
-            # Access attribute using dot notation, not .get()
-            content = doc.page_content 
-        
-            if content not in seen_contents:
-                seen_contents.add(content)
-                unique_docs.append(doc)
-            
-        return unique_docs
+        """Returns a unique union of retrieved (document, score) pairs, keeping the best score per chunk."""
+        best_scores = {}
+        unique_docs = {}
+
+        for sublist in documents:
+            for doc, score in sublist:
+                content = doc.page_content
+                if content not in best_scores or score > best_scores[content]:
+                    best_scores[content] = score
+                    unique_docs.setdefault(content, doc)
+
+        return sorted(
+            ((unique_docs[content], score) for content, score in best_scores.items()),
+            key=lambda pair: pair[1],
+            reverse=True,
+        )
+
+    def _rag_chain(self, model=None):
+        """Builds the chain that answers a question from the retrieved context."""
+        template = """
+        Answer the following question based on the provided context.
+        Don't include any references to the question or the context in the response.
+        Keep the answer relevant to the question and the context.
+        Do not include any information outside of the given context.
         
+        ### Input:
+        Context: {context}
+        Question: {question}
+        """
 
-    def _construct_rag_chain(self, question, context):
+        answer_prompt = ChatPromptTemplate.from_template(template)
+        return answer_prompt | (model or self.model)
+
+    def _construct_rag_chain(self, question, context, model=None):
         """Constructs a RAG chain response based on context and question."""
+        response = self._rag_chain(model).invoke({"context": context, "question": question})
+        return "ok", response.content
+
+    async def _aconstruct_rag_chain(self, question, context, model=None):
+        """Async variant of `_construct_rag_chain`."""
+        response = await self._rag_chain(model).ainvoke(
+            {"context": context, "question": question}
+        )
+        return "ok", response.content
+
+    def _structured_rag_chain(self, model=None):
+        """Builds the chain that answers a question and flags whether it could be answered, in one call."""
         template = """
         Answer the following question based on the provided context.
         Don't include any references to the question or the context in the response.
         Keep the answer relevant to the question and the context.
         Do not include any information outside of the given context.
+
+        Set 'answered' to true if the answer is related to the question and provides at least
+        some relevant information, even if the context only answers it partially or indirectly.
+        Set 'answered' to false if the context contains no information related to the question.
         
         ### Input:
         Context: {context}
@@ -110,15 +179,27 @@ class RetrievalPipeline:
         """
 
         answer_prompt = ChatPromptTemplate.from_template(template)
-        prompt_input = answer_prompt.format(question=question, context=context)
+        return answer_prompt | (model or self.model).with_structured_output(RagAnswer)
 
-        chain = answer_prompt | self.model
-        response = chain.invoke({"context": context, "question": question})
-        return "ok", response.content
+    def _construct_structured_rag_chain(self, question, context, model=None):
+        """Constructs the RAG response and its answered flag with a single structured-output call."""
+        result = self._structured_rag_chain(model).invoke({"context": context, "question": question})
+        return "ok", result.answer, result.answered
 
-    def _check_response(self, question, response):
-        """Check if the response is a valid answer."""
+    async def _aconstruct_structured_rag_chain(self, question, context, model=None):
+        """Async variant of `_construct_structured_rag_chain`."""
+        result = await self._structured_rag_chain(model).ainvoke(
+            {"context": context, "question": question}
+        )
+        return "ok", result.answer, result.answered
+
+    @staticmethod
+    def _use_structured_answer(model_name: str) -> bool:
+        """Whether the answer and validity check are generated in one structured-output call."""
+        return Config.STRUCTURED_ANSWER and model_name not in Config.STRUCTURED_OUTPUT_UNSUPPORTED_MODELS
 
+    def _check_chain(self, model=None):
+        """Builds the chain that checks if a response answers the question."""
         template = """ 
         Check if the response provides an answer or at least some relevant information related to the question.
         Return 'True' if the response is related and provides some answer to the question, otherwise return 'False'.
@@ -150,19 +231,33 @@ class RetrievalPipeline:
         """
 
         check_answer_prompt = ChatPromptTemplate.from_template(template)
-        prompt_input = check_answer_prompt.format(question=question, response=response)
+        return check_answer_prompt | (model or self.model)
 
-        chain = check_answer_prompt | self.model
-        is_answered = chain.invoke({"question": question, "response": response})
+    def _check_response(self, question, response, model=None):
+        """Check if the response is a valid answer."""
+        is_answered = self._check_chain(model).invoke(
+            {"question": question, "response": response}
+        )
+        return "False" not in is_answered.content
 
-        if "False" in is_answered.content:
-            return False
-        else:
-            return True
+    async def _acheck_response(self, question, response, model=None):
+        """Async variant of `_check_response`."""
+        is_answered = await self._check_chain(model).ainvoke(
+            {"question": question, "response": response}
+        )
+        return "False" not in is_answered.content
+
+    def retrieve_docs(self, queries, lexical_docs=None):
+        """Retrieves the unique union of (document, score) pairs for all alternative queries.
 
-    def retrieve_docs(self, queries):
-        retrieved_docs = [self.retriever.invoke(query) for query in queries]
-        unique_docs = self.get_unique_union(retrieved_docs)
+        With lexical (BM25) hits, the dense result lists and the lexical list are combined by
+        reciprocal rank fusion instead.
+        """
+        retrieved_docs = self.retriever_instance.search_by_queries(queries)
+        if lexical_docs:
+            unique_docs = self.retriever_instance.fuse_rankings([*retrieved_docs, lexical_docs])
+        else:
+            unique_docs = self.get_unique_union(retrieved_docs)
 
         if self.filters and "alpha" in self.filters:
             unique_docs = self.re_rank_docs_based_on_recency(
@@ -171,62 +266,247 @@ class RetrievalPipeline:
 
         return unique_docs
 
-    def get_response(self, user_query: str, history: List[str]):
-        """Handles the full flow: rephrase query, generate multi-queries, retrieve documents, and generate final response."""
+    def _source_chunks(self, response, unique_docs):
+        """Re-ranks the retrieved chunks against the response and returns the source details."""
+        re_ranked_chunks = self.retriever_instance.re_rank_chunks_with_response(
+            response, unique_docs
+        )
+
+        # Get metadata of the top chunks
+        top_chunks_metadata = [
+            {"source": chunk.metadata.get("source", "Unknown"), "score": score}
+            for chunk, score in re_ranked_chunks
+        ]
+
+        return self.filter_chunks_for_source(top_chunks_metadata)
+
+    def _stage_model(self, stage: str, stage_models: Optional[Dict[str, str]] = None):
+        """Returns the (model, model_name) used for a pipeline stage.
+
+        Stages without an entry (or with an unknown model name) use the model selected for the pipeline.
+        """
+        if stage_models is None:
+            stage_models = Config.STAGE_MODELS
+        model_name = stage_models.get(stage)
+        if model_name and model_name in self.llms:
+            return self.llms[model_name], model_name
+        return self.model, self.model_name
+
+    def _cache_scope(self, stage_models=None):
+        """Returns the answer cache scope: the answering model and the normalized filters."""
+        _, answer_model_name = self._stage_model("answer", stage_models)
+        return (answer_model_name, *self.cache_scope[1:])
+
+    def _lookup_answer(self, rephrased_query, stage_models=None):
+        """Returns the cached (response, sources) for a similar earlier query, or None."""
+        if self.answer_cache is None:
+            return None
+        query_embedding = self.retriever_instance.embedding_model.embed_query(rephrased_query)
+        return self.answer_cache.lookup(self._cache_scope(stage_models), query_embedding)
+
+    def _store_answer(self, rephrased_query, response, sources, stage_models=None):
+        """Stores an answered query in the answer cache."""
+        if self.answer_cache is None:
+            return
+        query_embedding = self.retriever_instance.embedding_model.embed_query(rephrased_query)
+        self.answer_cache.store(
+            self._cache_scope(stage_models), rephrased_query, query_embedding, response, sources
+        )
+
+    @staticmethod
+    def _clean_generated_queries(generated_queries):
+        """Drops empty lines and trailing whitespace from the generated queries."""
+        return [query.rstrip() for query in generated_queries if query.strip()]
+
+    def get_response(self, user_query: str, history: List[str], stage_models: Optional[Dict[str, str]] = None):
+        """Handles the full flow: rephrase query, generate multi-queries, retrieve documents, and generate final response.
+
+        `stage_models` maps pipeline stages (rephrase, translate, multi_query, answer, check)
+        to model names; it defaults to Config.STAGE_MODELS.
+        """
         # Step 1: Rephrase query based on history
         # Get the last two messages from the history
         if history:
             history = history[-2:]
-            status, rephrased_query = self._rephrase_query(user_query, history)
+            model, _ = self._stage_model("rephrase", stage_models)
+            status, rephrased_query = self._rephrase_query(user_query, history, model)
             if status == "violation":
                 return rephrased_query, ""
         else:
             rephrased_query = user_query
 
-        # Step 2: Generate alternative queries
-        target_language = "de" if detect(user_query) == "en" else "en"
-        translated_query = self.translator.translate_text(
-            rephrased_query, target_language, self.model, self.model_name
-        )
-        alternative_queries = [rephrased_query, translated_query]
+        cached_answer = self._lookup_answer(rephrased_query, stage_models)
+        if cached_answer:
+            return cached_answer
 
-        status, generated_queries = self._generate_multi_queries(rephrased_query)
-        generated_queries = [query for query in generated_queries if query.strip()]
-        generated_queries = [q.rstrip() for q in generated_queries]
+        # Step 2: Generate alternative queries, unless exact-term (lexical) hits are already strong
+        lexical_docs = self.retriever_instance.lexical_search(rephrased_query)
+        if self.retriever_instance.is_strong_lexical_match(rephrased_query, lexical_docs):
+            alternative_queries = [rephrased_query]
+        else:
+            alternative_queries = [rephrased_query]
+            # With translated twins in the index, the query matches both languages as it is
+            if not Config.BILINGUAL_INDEX:
+                target_language = "de" if detect(user_query) == "en" else "en"
+                model, model_name = self._stage_model("translate", stage_models)
+                translated_query = self.translator.translate_text(
+                    rephrased_query, target_language, model, model_name
+                )
+                alternative_queries.append(translated_query)
+
+            model, _ = self._stage_model("multi_query", stage_models)
+            status, generated_queries = self._generate_multi_queries(rephrased_query, model)
+            generated_queries = self._clean_generated_queries(generated_queries)
 
-        if status == "violation":
-            return generated_queries, ""
-        alternative_queries.extend(generated_queries)
+            if status == "violation":
+                return generated_queries, ""
+            alternative_queries.extend(generated_queries)
 
         # Step 3: Retrieve documents
-        unique_docs = self.retrieve_docs(alternative_queries)
+        unique_docs = self.retrieve_docs(alternative_queries, lexical_docs)
 
         # Step 4: Construct RAG response
-        status, response = self._construct_rag_chain(rephrased_query, unique_docs)
-        if status == "violation":
-            return response, ""
+        context = self.context_builder.build(unique_docs)
+        model, model_name = self._stage_model("answer", stage_models)
+        if self._use_structured_answer(model_name):
+            status, response, have_response = self._construct_structured_rag_chain(
+                rephrased_query, context, model
+            )
+            if status == "violation":
+                return response, ""
+        else:
+            status, response = self._construct_rag_chain(rephrased_query, context, model)
+            if status == "violation":
+                return response, ""
 
-        have_response = self._check_response(rephrased_query, response)
+            model, _ = self._stage_model("check", stage_models)
+            have_response = self._check_response(rephrased_query, response, model)
 
         if not have_response:
             return "No-Response", ""
 
         # Step 5: Retrieve Sources for the Generated Response
-        re_ranked_chunks = self.retriever_instance.re_rank_chunks_with_response(
-            response, unique_docs
-        )
+        final_chunks = self._source_chunks(response, unique_docs)
+        self._store_answer(rephrased_query, response, final_chunks, stage_models)
+        return response, final_chunks
 
-        # Get metadata of the top chunks
-        if self.filters and "alpha" in self.filters:
-            top_chunks_metadata = [
-                {"source": chunk[0].metadata.get("source", "Unknown"), "score": score}
-                for chunk, score in re_ranked_chunks
-            ]
+    async def _aretrieve_context(self, user_query: str, history: List[str], stage_models=None):
+        """Runs the async pre-generation stages.
+
+        Returns the rephrased query, the retrieved documents and an early
+        (response, sources) result when the pipeline must stop before generation.
+        """
+        # Step 1: Rephrase query based on history
+        if history:
+            history = history[-2:]
+            model, _ = self._stage_model("rephrase", stage_models)
+            status, rephrased_query = await self._arephrase_query(user_query, history, model)
+            if status == "violation":
+                return rephrased_query, [], (rephrased_query, "")
         else:
-            top_chunks_metadata = [
-                {"source": chunk.metadata.get("source", "Unknown"), "score": score}
-                for chunk, score in re_ranked_chunks
-            ]
+            rephrased_query = user_query
 
-        final_chunks = self.filter_chunks_for_source(top_chunks_metadata)
+        cached_answer = await run_blocking(self._lookup_answer, rephrased_query, stage_models)
+        if cached_answer:
+            return rephrased_query, [], cached_answer
+
+        # Step 2: Translation and multi-query generation only depend on the
+        # rephrased query, so both LLM calls run concurrently. Both are skipped
+        # when exact-term (lexical) hits are already strong.
+        lexical_docs = await run_blocking(self.retriever_instance.lexical_search, rephrased_query)
+        if self.retriever_instance.is_strong_lexical_match(rephrased_query, lexical_docs):
+            alternative_queries = [rephrased_query]
+        else:
+            multi_query_model, _ = self._stage_model("multi_query", stage_models)
+            if Config.BILINGUAL_INDEX:
+                # With translated twins in the index, the query matches both languages as it is
+                translated_queries = []
+                status, generated_queries = await self._agenerate_multi_queries(
+                    rephrased_query, multi_query_model
+                )
+            else:
+                target_language = "de" if await run_blocking(detect, user_query) == "en" else "en"
+                translate_model, translate_model_name = self._stage_model("translate", stage_models)
+                translated_query, (status, generated_queries) = await asyncio.gather(
+                    self.translator.atranslate_text(
+                        rephrased_query, target_language, translate_model, translate_model_name
+                    ),
+                    self._agenerate_multi_queries(rephrased_query, multi_query_model),
+                )
+                translated_queries = [translated_query]
+            generated_queries = self._clean_generated_queries(generated_queries)
+
+            if status == "violation":
+                return rephrased_query, [], (generated_queries, "")
+            alternative_queries = [rephrased_query, *translated_queries, *generated_queries]
+
+        # Step 3: Retrieve documents
+        unique_docs = await run_blocking(self.retrieve_docs, alternative_queries, lexical_docs)
+        return rephrased_query, unique_docs, None
+
+    async def _afinalize_response(self, rephrased_query, response, unique_docs, stage_models=None, have_response=None):
+        """Checks the generated response (unless already known) and attaches its sources."""
+        if have_response is None:
+            model, _ = self._stage_model("check", stage_models)
+            have_response = await self._acheck_response(rephrased_query, response, model)
+
+        if not have_response:
+            return "No-Response", ""
+
+        # Step 5: Retrieve Sources for the Generated Response
+        final_chunks = await run_blocking(self._source_chunks, response, unique_docs)
+        await run_blocking(self._store_answer, rephrased_query, response, final_chunks, stage_models)
         return response, final_chunks
+
+    async def aget_response(self, user_query: str, history: List[str], stage_models: Optional[Dict[str, str]] = None):
+        """Async variant of `get_response` that runs independent LLM stages concurrently."""
+        rephrased_query, unique_docs, early_result = await self._aretrieve_context(
+            user_query, history, stage_models
+        )
+        if early_result is not None:
+            return early_result
+
+        # Step 4: Construct RAG response
+        context = await run_blocking(self.context_builder.build, unique_docs)
+        model, model_name = self._stage_model("answer", stage_models)
+        have_response = None
+        if self._use_structured_answer(model_name):
+            status, response, have_response = await self._aconstruct_structured_rag_chain(
+                rephrased_query, context, model
+            )
+        else:
+            status, response = await self._aconstruct_rag_chain(rephrased_query, context, model)
+        if status == "violation":
+            return response, ""
+
+        return await self._afinalize_response(
+            rephrased_query, response, unique_docs, stage_models, have_response
+        )
+
+    async def astream_response(self, user_query: str, history: List[str], stage_models: Optional[Dict[str, str]] = None):
+        """Streams the answer as ("token", text) events, followed by one ("final", (response, sources)) event.
+
+        Tokens are streamed from the plain answer chain, so the validity check always runs as a separate call here.
+        """
+        rephrased_query, unique_docs, early_result = await self._aretrieve_context(
+            user_query, history, stage_models
+        )
+        if early_result is not None:
+            yield "final", early_result
+            return
+
+        # Step 4: Stream the RAG response as it is generated
+        context = await run_blocking(self.context_builder.build, unique_docs)
+        model, _ = self._stage_model("answer", stage_models)
+        tokens = []
+        async for chunk in self._rag_chain(model).astream(
+            {"context": context, "question": rephrased_query}
+        ):
+            if chunk.content:
+                tokens.append(chunk.content)
+                yield "token", chunk.content
+        response = "".join(tokens)
+
+        yield "final", await self._afinalize_response(
+            rephrased_query, response, unique_docs, stage_models
+        )
@@ -2,6 +2,12 @@ import chromadb
 import os
 from pathlib import Path
 from pdf_chatbot.core.services.config import Config
+from pdf_services.vector_storage.centroid_index import CentroidIndex
+from pdf_services.vector_storage.corpus_version import CorpusVersion
+from pdf_services.vector_storage.full_vector_store import FullVectorStore
+from pdf_services.vector_storage.lexical_index import LexicalIndex
+from pdf_services.vector_storage.pdf_registry import PDFRegistry
+from pdf_services.vector_storage.year_partitions import YearPartitions
 
 
 class RemovePDF:
@@ -18,21 +24,44 @@ class RemovePDF:
         
         try:
             client = chromadb.PersistentClient(path=Config.CHROMA_PATH)
-            collection = client.get_collection(name="multi_modal_rag")
+            names = ["multi_modal_rag"]
+            if Config.YEAR_PARTITIONED:
+                names += YearPartitions(Config.CHROMA_PATH).list_partitions()
         except:
             return {"Error": "Can't connect to ChromaDB"}
 
+        # Only look into collections that exist, deleting must not create empty ones
+        collections = []
+        for name in names:
+            try:
+                collections.append(client.get_collection(name=name))
+            except Exception:
+                continue
+
         # Get the PDF embeddings for the given PDF title
-        pdfs=collection.get(
-            where={'title':pdf_title}
-        )
-        if pdfs['ids']==[]:
+        found = []
+        for collection in collections:
+            pdfs=collection.get(
+                where={'title':pdf_title}
+            )
+            if pdfs['ids']:
+                found.append((collection, pdfs['ids']))
+        if not found:
             return {"Error": f"PDF embeddings not found for PDF: {pdf_title}"}  
 
         try:  
-            collection.delete(
-                ids=pdfs['ids']
-            )
+            for collection, ids in found:
+                collection.delete(
+                    ids=ids
+                )
+            CentroidIndex(Config.CHROMA_PATH).delete(pdf_title)
+            LexicalIndex(Config.LEXICAL_INDEX_PATH).delete_title(pdf_title)
+            PDFRegistry(Config.PDF_REGISTRY_PATH).delete_title(pdf_title)
+            if Config.REDUCED_DIMENSIONS:
+                FullVectorStore(Config.FULL_VECTORS_PATH).delete(
+                    [chunk_id for _, ids in found for chunk_id in ids]
+                )
+            CorpusVersion().bump()
             return "Success"      
         except:
             return  {"Error": f"Cannot delete embeddings for PDF: {pdf_name}"}  
@@ -7,8 +7,8 @@ class Translator:
     def __init__(self):
         pass
     
-    def translate_text(self, text: str, target_language: str, model, model_name) -> str:
-        """Translate the text to the target language."""
+    def _translation_chain(self, text: str, target_language: str, model):
+        """Build the chain that translates the text to the target language."""
 
         template = f"""
         You are a helpful assistant who is an expert in translating any text to
@@ -19,8 +19,17 @@ class Translator:
         """
         
         prompt = ChatPromptTemplate.from_template(template)
-        
-        chain = prompt | model
+        return prompt | model
+
+    def translate_text(self, text: str, target_language: str, model, model_name) -> str:
+        """Translate the text to the target language."""
+        chain = self._translation_chain(text, target_language, model)
         response = chain.invoke({"text": text, "target_language": target_language})
         return response.content
+
+    async def atranslate_text(self, text: str, target_language: str, model, model_name) -> str:
+        """Async variant of `translate_text`."""
+        chain = self._translation_chain(text, target_language, model)
+        response = await chain.ainvoke({"text": text, "target_language": target_language})
+        return response.content
         
\ No newline at end of file
@@ -11,7 +11,7 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from models.query import Query
 from pdf_chatbot.core.query.query_handler import PDFQuery
 from pdf_chatbot.core.services.pdf_core_services import PdfCoreServices
@@ -51,37 +51,53 @@ async def reset_conversation(session_id: str):
 async def query_pdf(
     query: PDFQuery, session_id: str = uuid4().hex, llm_model: str = "4o"
 ):
-    return app_services.query_pdf_answer(query, session_id, llm_model)
+    return await app_services.aquery_pdf_answer(query, session_id, llm_model)
+
+
+@app.post("/query_pdf/stream", tags=["query"])
+async def query_pdf_stream(
+    query: PDFQuery, session_id: str = uuid4().hex, llm_model: str = "4o"
+):
+    return StreamingResponse(
+        app_services.astream_query_pdf_answer(query, session_id, llm_model),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/cache_stats", tags=["query"])
+async def cache_stats():
+    return app_services.cache_stats()
 
 
 @app.post("/download_pdf", tags=["query"])
 async def download_pdf(query: PDFQuery):
-    return app_services.download_pdf_from_scholar(query)
+    return await app_services.adownload_pdf_from_scholar(query)
 
 
 @app.post("/upload_scholar_pdf", tags=["query"])
 async def upload_scholar_pdf():
-    return app_services.upload_scholar_pdf()
+    return await app_services.aupload_scholar_pdf()
 
 
 @app.get("/pdfs", tags=["pdf_operations"])
 async def list_pdfs():
-    return pdf_core_services.list_pdfs()
+    return await pdf_core_services.alist_pdfs()
 
 
 @app.get("/pdfs/{pdf_name}", tags=["pdf_operations"])
 async def get_pdf(pdf_name: str):
-    return pdf_core_services.get_pdf(pdf_name)
+    return await pdf_core_services.aget_pdf(pdf_name)
 
 
 @app.delete("/deletepdf/{pdf_name}", tags=["pdf_operations"])
 async def delete_pdf(pdf_name: str):
-    return pdf_core_services.delete_pdf(pdf_name)
+    return await pdf_core_services.adelete_pdf(pdf_name)
 
 
 @app.post("/clear-pdf-folder")
 async def clear_pdf_folder():
-    response = pdf_core_services.clear_pdf_folder()
+    response = await pdf_core_services.aclear_pdf_folder()
     return JSONResponse(
         content=response, status_code=200 if "message" in response else 500
     )
@@ -89,14 +105,14 @@ async def clear_pdf_folder():
 
 @app.get("/list-downloaded-pdfs")
 async def list_downloaded_pdfs():
-    return pdf_core_services.list_downloaded_pdfs()
+    return await pdf_core_services.alist_downloaded_pdfs()
 
 
 @app.get("/downloaded-pdfs/{pdf_name}", tags=["pdf_operations"])
 async def get_downloaded_pdf(pdf_name: str):
-    return pdf_core_services.get_downloaded_pdf(pdf_name)
+    return await pdf_core_services.aget_downloaded_pdf(pdf_name)
 
 
 @app.post("/delete_unselected_pdfs")
 async def delete_unselected_pdfs(selected_pdfs: list[str]):
-    return pdf_core_services.delete_unselected_pdfs(selected_pdfs)
+    return await pdf_core_services.adelete_unselected_pdfs(selected_pdfs)
@@ -1,4 +1,5 @@
 """Module covering the services of the Chatbot"""
+import json
 import sys
 import warnings
 from os.path import abspath, dirname, realpath
@@ -18,6 +19,8 @@ from pdf_services.scholar_article_handler.scholar_data_retriever import (
 )
 from pdf_chatbot.core.conversation.conversation_manager import ConversationManager
 from pdf_chatbot.core.services.pdf_core_services import PdfCoreServices
+from pdf_services.utils.blocking_executor import run_blocking
+from pdf_services.vector_storage.cached_embeddings import CachedEmbeddings
 
 logging = logging.getLogger(__name__)
 
@@ -45,13 +48,48 @@ class Services:
 
     def query_pdf_answer(self, query: PDFQuery, session_id: str, llm_model: str):
         response = self.query_handler.handle_query(
-            user_query=query.query, filters=query.filters, session_id=session_id, history=self.chat_history.get_history(), llm_model=llm_model
+            user_query=query.query, filters=query.filters, session_id=session_id, history=self.chat_history.get_history(), llm_model=llm_model, stage_models=query.stage_models
+        )
+        return response
+
+    async def aquery_pdf_answer(self, query: PDFQuery, session_id: str, llm_model: str):
+        response = await self.query_handler.ahandle_query(
+            user_query=query.query, filters=query.filters, session_id=session_id, history=self.chat_history.get_history(), llm_model=llm_model, stage_models=query.stage_models
         )
         return response
     
+    async def astream_query_pdf_answer(self, query: PDFQuery, session_id: str, llm_model: str):
+        """
+        Yield the answer as Server-Sent Events: `token` events, then one `final` event,
+        or an `error` event if retrieval or generation fails midway.
+        """
+        try:
+            async for event, data in self.query_handler.astream_query(
+                user_query=query.query, filters=query.filters, session_id=session_id, llm_model=llm_model, stage_models=query.stage_models
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            logging.exception("Streaming answer failed")
+            error = {"message": "Error occurred while generating the answer! Please try again.", "error": str(e)}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
     def download_pdf_from_scholar(self, query: Query):
         return self.scholar_retriever.download_pdf(query=query.query, num_pdf=query.num_pdf, source=query.source)
 
     def upload_scholar_pdf(self):
         return self.scholar_retriever.ingest_scholar_pdf()
+
+    async def adownload_pdf_from_scholar(self, query: Query):
+        return await run_blocking(self.download_pdf_from_scholar, query)
+
+    async def aupload_scholar_pdf(self):
+        return await run_blocking(self.upload_scholar_pdf)
+
+    def cache_stats(self):
+        """Return the hit/miss statistics of the query caches."""
+        answer_cache = self.query_handler.pipeline_pool.answer_cache
+        return {
+            "embeddings": CachedEmbeddings.shared().stats(),
+            "answers": answer_cache.stats() if answer_cache else None,
+        }
     
\ No newline at end of file
@@ -5,23 +5,39 @@ PATH = realpath(abspath(__file__))
 sys.path.insert(0, dirname(PATH))
 sys.path.insert(0, dirname(dirname(PATH)))
 
+import hashlib
 import os
-import shutil
+import queue
+import tempfile
+import threading
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Tuple
 
 import uvicorn
 from pdf_services.pdf_image_handler.image_processor import ImageProcessor
+from pdf_services.pdf_ingestion.ingestion_jobs import IngestionJobQueue
 from pdf_services.pdf_ingestion.pdf_ingestion_manager import PDFIngestionManager
-from fastapi import FastAPI, HTTPException, UploadFile
+from fastapi import FastAPI, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 
 from pdf_services.config.settings import Config
+from pdf_services.utils.blocking_executor import run_blocking
 from pdf_services.vector_storage.vectorstore_manager import VectorStoreManager
 
-pdf_ingestion = PDFIngestionManager(VectorStoreManager(), ImageProcessor())
 
 
-app = FastAPI(title="EMB Chatbot")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Built on startup rather than at import, so importing this module (e.g. by spawned
+    # ingest workers or the uvicorn import string) opens no stores and starts no job threads
+    app.state.pdf_ingestion = PDFIngestionManager(VectorStoreManager(), ImageProcessor())
+    app.state.ingestion_jobs = IngestionJobQueue(app.state.pdf_ingestion)
+    recover_uploads(app.state.ingestion_jobs)
+    yield
+
+
+app = FastAPI(title="EMB Chatbot", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -34,22 +50,104 @@ UPLOAD_PATH = Config.PDF_FOLDER
 DEST_PATH = Path(Config.DEST_FOLDER)
 CHROMA_PATH = Config.CHROMA_PATH
 
+# Serializes the name check, rename and job submission of finished uploads
+upload_lock = threading.Lock()
+
 
 @app.post("/upload-pdf", tags=["pdf_operations"])
-async def upload_pdf(file: UploadFile):
+async def upload_pdf(file: UploadFile, request: Request):
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are allowed.")
     file_path = os.path.join(UPLOAD_PATH, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    tmp_path, pdf_hash = await run_blocking(save_upload, file)
+    registered = await run_blocking(request.app.state.pdf_ingestion.find_registered, pdf_hash)
+    if registered is not None:
+        os.remove(tmp_path)
+        return {"message": PDFIngestionManager.duplicate_message(registered)}
+    job = await run_blocking(
+        submit_upload, request.app.state.ingestion_jobs, tmp_path, file_path, file.filename, pdf_hash
+    )
+    return {
+        "message": "PDF uploaded! It is being processed in the background.",
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}",
+    }
+
+
+@app.get("/jobs/{job_id}", tags=["pdf_operations"])
+async def get_job(job_id: str, request: Request):
+    """Status and per-stage progress of a background ingestion job."""
+    job = request.app.state.ingestion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+
+def save_upload(file: UploadFile) -> Tuple[str, str]:
+    """
+    Stream the uploaded file in chunks to a new temporary file in the upload folder,
+    hashing it on the way. Returns the temporary path and the sha256. The ".part"
+    file is ignored by folder scans until it is renamed to the PDF name.
+    """
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_PATH, suffix=".part")
     try:
-        result = pdf_ingestion.start_ingest()
-        if isinstance(result, dict) and "message" in result:
-            return result
-        return {"message": "PDF processed and uploaded successfully!"}
-    except Exception as e:
-        raise {"message": f"Error occurred in processig PDF! Please try again."}
+        with os.fdopen(fd, "wb") as buffer:
+            while chunk := file.file.read(Config.UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                buffer.write(chunk)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()
+
+
+def submit_upload(
+    ingestion_jobs: IngestionJobQueue, tmp_path: str, file_path: str, filename: str, pdf_hash: str
+):
+    """Move a saved upload to its PDF name and queue its ingestion job.
+
+    A file left at the PDF name by a failed job is replaced. Raises HTTPException if a PDF
+    of the same name is still waiting or being processed, or if the job queue is full.
+    """
+    with upload_lock:
+        if ingestion_jobs.has_pending(filename):
+            os.remove(tmp_path)
+            raise HTTPException(
+                status_code=409,
+                detail="A PDF with this name is already being processed! Please try again later.",
+            )
+        os.replace(tmp_path, file_path)
+        try:
+            return ingestion_jobs.submit(filename, pdf_hash)
+        except queue.Full:
+            os.remove(file_path)
+            raise HTTPException(
+                status_code=503,
+                detail="Too many PDFs are being processed! Please try again later.",
+            )
+
+
+def recover_uploads(ingestion_jobs: IngestionJobQueue) -> None:
+    """
+    Clean up after an unclean shutdown: delete unfinished ".part" uploads and queue a job for
+    every PDF still in the upload folder (processed PDFs are moved out, so these were never
+    ingested). PDFs that don't fit in the queue stay in place for the next start.
+    """
+    os.makedirs(UPLOAD_PATH, exist_ok=True)
+    for filename in sorted(os.listdir(UPLOAD_PATH)):
+        if filename.endswith(".part"):
+            os.remove(os.path.join(UPLOAD_PATH, filename))
+    for filename in sorted(os.listdir(UPLOAD_PATH)):
+        if not filename.endswith(".pdf"):
+            continue
+        try:
+            ingestion_jobs.submit(filename)
+        except queue.Full:
+            print(f"Ingestion queue is full, {filename} will be queued on the next start.")
+            break
+        print(f"Queued leftover upload {filename}.")
 
 
 if __name__ == "__main__":
-    uvicorn.run("pdf_main:app", host="0.0.0.0", port=8001, reload=False)
+    uvicorn.run(app, host="0.0.0.0", port=8001, reload=False)
@@ -7,6 +7,64 @@ class Config:
     
     # ChromaDB settings
     CHROMA_PATH = "data/pdf_embeddings"
+    CENTROID_COLLECTION = "pdf_centroids"  # One mean vector per PDF, used for two-level retrieval
+
+    # Store PDFs in one collection per YEAR_PARTITION_SIZE-year bucket instead of a single
+    # collection. Migrate an existing store with `python -m pdf_services.vector_storage.year_partitions`.
+    YEAR_PARTITIONED = False
+    YEAR_PARTITION_SIZE = 5
+
+    # Two-stage vector search: store REDUCED_DIMENSIONS-dim vectors in the ANN index and the full
+    # vectors (float16, memory-mapped) in FULL_VECTORS_PATH for exact rescoring. None disables it.
+    # Build the reduced store with `python -m pdf_services.vector_storage.reduced_embeddings migrate`
+    # and point CHROMA_PATH at it.
+    REDUCED_DIMENSIONS = None
+    FULL_VECTORS_PATH = "data/full_vectors"
+
+    # Read-only snapshot for query replicas, exported with `python -m pdf_services.vector_storage.snapshot`
+    SNAPSHOT_PATH = "data/vector_snapshot"
+    SNAPSHOT_DTYPE = "float16"
+
+    # BM25 index (SQLite FTS5) over the same chunks, maintained during ingestion.
+    # Backfill with `python -m pdf_services.vector_storage.lexical_index`.
+    LEXICAL_INDEX_PATH = "data/lexical_index.sqlite3"
+
+    # sha256 of every ingested PDF, checked before parsing to reject duplicate uploads.
+    # Backfilled from the chunk ids on first use, or with `python -m pdf_services.vector_storage.pdf_registry`.
+    PDF_REGISTRY_PATH = "data/pdf_registry.sqlite3"
+
+    # Store a translated twin of every new chunk (id "{chunk_id}:tr-{lang}") so queries in either
+    # language match without translating the query. Add twins for existing PDFs with
+    # `python -m pdf_services.pdf_ingestion.chunk_translator`.
+    BILINGUAL_TWINS = False
+    TWIN_LANGUAGES = ["en", "de"]
+    TWIN_TRANSLATION_MODEL = "gpt-4o-mini"
+    TWIN_MAX_CONCURRENCY = 8
+
+    # Embeddings settings
+    EMBEDDING_MODEL = "text-embedding-3-large"
+    EMBEDDING_CACHE_PATH = "data/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_SIZE = 2048  # Number of vectors kept in memory
+    EMBEDDING_CACHE_DISK_SIZE = 50000  # Number of vectors kept on disk (~12 KB each at 3072 dimensions)
+
+    # Threads available to async routes for blocking work (LLM, Chroma, file I/O, ingestion)
+    BLOCKING_WORKERS = 8
+
+    # Counter bumped whenever documents are added to or removed from the corpus
+    CORPUS_VERSION_PATH = "data/corpus_version.sqlite3"
+
+    # Background ingestion of uploads: worker threads, queued jobs before uploads are
+    # rejected, and finished jobs kept for /jobs/{job_id}
+    INGEST_WORKERS = 2
+    INGEST_QUEUE_SIZE = 32
+    INGEST_JOB_HISTORY = 500
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # Bytes read per step while streaming an upload to disk
+
+    # Parallel ingestion of multi-PDF batches (e.g. Scholar downloads): processes for parsing and
+    # image extraction, and PDFs summarized and embedded at once. Vector store writes stay serial.
+    PARALLEL_INGEST = True
+    INGEST_PROCESSES = max((os.cpu_count() or 2) - 1, 1)
+    INGEST_NETWORK_CONCURRENCY = 4
 
     # pdf_ingestion_manager.py
     PDF_FOLDER = "data/uploaded_pdfs"
@@ -48,6 +106,15 @@ class Config:
     BOTTOM_MARGIN = 200
     THRESHOLD = 254
 
+    # Page triage on the vector layer: only pages with images, sizeable drawings, at least
+    # TRIAGE_MIN_DRAWINGS drawings or text blocks covering less than TRIAGE_MAX_TEXT_COVERAGE
+    # of the page are rendered, at TRIAGE_DPI for contour detection. Detected figures are then
+    # rendered at full resolution from their clip. False renders every page at DPI.
+    TRIAGE_PAGES = True
+    TRIAGE_DPI = 150
+    TRIAGE_MIN_DRAWINGS = 10
+    TRIAGE_MAX_TEXT_COVERAGE = 0.3
+
     # Minimum image size settings
     MIN_WIDTH_PIXELS = 50
     MIN_HEIGHT_PIXELS = 50
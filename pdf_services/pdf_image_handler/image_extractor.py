@@ -6,13 +6,12 @@ from PDFs and returns them for further steps.
 """
 
 import os
-from typing import List, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 import cv2
 import fitz
 import numpy as np
 from pdf_services.config.settings import Config
-from pdf2image import convert_from_path
 from PIL import Image
 from tqdm import tqdm
 
@@ -39,12 +38,47 @@ class ImageExtractor:
         self.scale_factor = Config.SCALE_FACTOR
         self.pixels_per_point = Config.PIXELS_PER_POINT
         self.threshold = Config.THRESHOLD
+        self.triage = Config.TRIAGE_PAGES
+        self.render_dpi = Config.TRIAGE_DPI if self.triage else dpi
 
-    def extract_images_from_pdf(self) -> List[Image.Image]:
+    def extract_images_from_pdf(
+        self, doc: fitz.Document
+    ) -> Iterator[Tuple[fitz.Page, List[Tuple[float, float, float, float]], np.ndarray]]:
         """
-        Convert each page of the PDF into an image.
+        Render the pages of the open PDF one at a time, yielding each page with
+        its drawing and image rects and its BGR image at the render DPI, so only
+        the current page image is held in memory. With triage, pages without
+        figure candidates in their vector layer are skipped without rendering.
         """
-        return convert_from_path(self.pdf_path, dpi=self.dpi)
+        zoom = self.render_dpi / 72
+        for page in tqdm(doc, desc="Extracting Images", total=doc.page_count):
+            drawings = page.get_drawings()
+            image_rects = self.extract_drawings_and_images_from_page(
+                page, self.pixels_per_point, drawings
+            )
+            if self.triage and not self.is_figure_candidate(page, drawings, image_rects):
+                continue
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            rgb = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+            yield page, image_rects, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+    def is_figure_candidate(
+        self, page, drawings: list, image_rects: List[Tuple[float, float, float, float]]
+    ) -> bool:
+        """
+        Cheap vector-layer triage of a page: it may hold a figure or table if it has
+        sizeable images or drawings, many small drawings (e.g. table rules or plot
+        strokes), or if text blocks cover little of it.
+        """
+        if image_rects or len(drawings) >= Config.TRIAGE_MIN_DRAWINGS:
+            return True
+        text_area = sum(
+            (x1 - x0) * (y1 - y0)
+            for x0, y0, x1, y1, _, _, block_type in page.get_text("blocks")
+            if block_type == 0
+        )
+        page_area = page.rect.width * page.rect.height
+        return page_area > 0 and text_area / page_area < Config.TRIAGE_MAX_TEXT_COVERAGE
 
     def rects_overlap(
         self,
@@ -113,10 +147,12 @@ class ImageExtractor:
         return combined_rects
 
     def detect_figures_from_contours(
-        self, image: np.ndarray
-    ) -> List[Tuple[int, int, int, int]]:
+        self, image: np.ndarray, scale: float = 1.0
+    ) -> List[Tuple[float, float, float, float]]:
         """
-        Detect figures using contours in an image.
+        Detect figures using contours in an image. `scale` is the resolution of the
+        image relative to the pixel size the thresholds and margins are given in
+        (PIXELS_PER_POINT); the returned rects are in those pixels.
         """
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         _, thresh = cv2.threshold(gray, self.threshold, 255, cv2.THRESH_BINARY_INV)
@@ -131,32 +167,38 @@ class ImageExtractor:
             area = w * h
             if (
                 (0.2 < aspect_ratio < 5)
-                and (area > 10000)
-                and (w >= self.min_width_pixels)
-                and (h >= self.min_height_pixels)
+                and (area > 10000 * scale * scale)
+                and (w >= self.min_width_pixels * scale)
+                and (h >= self.min_height_pixels * scale)
             ):
-                x_margin = max(0, x - self.left_margin)
-                y_margin = max(0, y - self.top_margin)
+                x_margin = max(0, x - self.left_margin * scale)
+                y_margin = max(0, y - self.top_margin * scale)
                 w_margin = min(
-                    image.shape[1] - x_margin, w + self.left_margin + self.right_margin
+                    image.shape[1] - x_margin, w + (self.left_margin + self.right_margin) * scale
                 )
                 h_margin = min(
-                    image.shape[0] - y_margin, h + self.top_margin + self.bottom_margin
+                    image.shape[0] - y_margin, h + (self.top_margin + self.bottom_margin) * scale
                 )
 
                 detected_figures.append(
-                    (x_margin, y_margin, x_margin + w_margin, y_margin + h_margin)
+                    (
+                        x_margin / scale,
+                        y_margin / scale,
+                        (x_margin + w_margin) / scale,
+                        (y_margin + h_margin) / scale,
+                    )
                 )
 
         return detected_figures
 
     def extract_drawings_and_images_from_page(
-        self, page, pixels_per_point
+        self, page, pixels_per_point, drawings: Optional[list] = None
     ) -> List[Tuple[float, float, float, float]]:
         """
         Extract drawings and images from a PDF page using PyMuPDF.
+        `drawings` are the page's already fetched get_drawings() results, if any.
         """
-        extracted_drawings = page.get_drawings()
+        extracted_drawings = page.get_drawings() if drawings is None else drawings
         extracted_images = page.get_images(full=True)
 
         image_rects = []
@@ -218,21 +260,20 @@ class ImageExtractor:
         Extract images and drawings from a PDF and return them
         as a combined list of full pages and detected images.
         """
-        pages = self.extract_images_from_pdf()
-        doc = fitz.open(self.pdf_path)
-        combined_images = []
+        with fitz.open(self.pdf_path) as doc:
+            return self._extract_images_from_doc(doc)
 
-        for page_num, page_image in enumerate(tqdm(pages, desc="Extracting Images")):
-            page = doc.load_page(page_num)
-            image = cv2.cvtColor(np.array(page_image), cv2.COLOR_RGB2BGR)
+    def _extract_images_from_doc(self, doc: fitz.Document) -> List[Image.Image]:
+        """
+        Detect and crop the figures of every page of the open PDF.
+        """
+        combined_images = []
+        # Resolution of the rendered pages relative to the pixel coordinates of the rects
+        scale = self.render_dpi / 72 / self.pixels_per_point
 
+        for page, image_rects, image in self.extract_images_from_pdf(doc):
             # Detect figures in the page using contours
-            detected_figures = self.detect_figures_from_contours(image)
-
-            # Extract drawings and images from the PDF page
-            image_rects = self.extract_drawings_and_images_from_page(
-                page, self.pixels_per_point
-            )
+            detected_figures = self.detect_figures_from_contours(image, scale)
 
             # Combine all detected rectangles
             all_rects = detected_figures + image_rects
@@ -244,7 +285,9 @@ class ImageExtractor:
             # Append detected images to the combined list
             for rect in combined_rects:
                 x0, y0, x1, y1 = rect
-                if rect in detected_figures:
+                # A low-resolution triage render is only used to find figures, which are
+                # then rendered at full resolution from their clip like drawings and images
+                if rect in detected_figures and scale == 1:
                     figure = image[int(y0) : int(y1), int(x0) : int(x1)]
                     combined_images.append(
                         Image.fromarray(cv2.cvtColor(figure, cv2.COLOR_BGR2RGB))
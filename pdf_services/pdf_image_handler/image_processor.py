@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from pdf_services.pdf_image_handler.image_extractor import ImageExtractor
 from pdf_services.pdf_image_handler.image_summarizer import ImageSummarizer
@@ -18,9 +18,11 @@ class ImageProcessor:
             return []
         return images
 
-    def summarize_images(self, images: List[str]) -> Tuple[List[str], List[str]]:
-        """Summarize the extracted images."""
+    def summarize_images(
+        self, images: List[str], progress: Optional[Callable] = None
+    ) -> Tuple[List[str], List[str]]:
+        """Summarize the extracted images. `progress(done, total)` is called after each image."""
         if not images:
             return [], []
         summarizer = ImageSummarizer()
-        return summarizer.summarize_images(images)
+        return summarizer.summarize_images(images, progress=progress)
@@ -1,6 +1,6 @@
 import base64
 import io
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from pdf_services.config.settings import Config
 from langchain.messages import HumanMessage
@@ -31,9 +31,9 @@ class ImageSummarizer:
         return msg.content
 
     def summarize_images(
-        self, images: List[Image.Image]
+        self, images: List[Image.Image], progress: Optional[Callable] = None
     ) -> Tuple[List[str], List[str]]:
-        """Generate summaries for a list of images."""
+        """Generate summaries for a list of images. `progress(done, total)` is called after each image."""
         img_base64_list = []
         image_summaries = []
 
@@ -61,7 +61,7 @@ class ImageSummarizer:
         Ensure each element is explained separately and in detail. If multiple elements share a common theme or are interrelated, describe their connections.
         """
 
-        for image in tqdm(images, desc="Summarizing Images"):
+        for done, image in enumerate(tqdm(images, desc="Summarizing Images"), start=1):
             try:
                 buffered = io.BytesIO()
                 image.save(buffered, format="PNG")
@@ -70,4 +70,6 @@ class ImageSummarizer:
                 image_summaries.append(self.image_summarize(img_base64, prompt))
             except Exception as e:
                 pass
+            if progress is not None:
+                progress(done, len(images))
         return img_base64_list, image_summaries
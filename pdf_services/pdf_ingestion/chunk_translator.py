@@ -0,0 +1,128 @@
+"""
+chunk_translator.py
+
+Creates translated twins of chunks at ingestion time. Each twin holds the
+translation of one chunk (id "{chunk_id}:tr-{lang}", metadata "twin_of" set to
+the original id and "original_text" to the original content) and is embedded
+next to the original, so a query in either language matches without
+translating the query.
+
+Usage (add twins for PDFs ingested before BILINGUAL_TWINS was enabled):
+    python -m pdf_services.pdf_ingestion.chunk_translator
+"""
+
+from typing import List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+from langdetect import LangDetectException, detect
+from pdf_services.config.settings import Config
+
+LANGUAGE_NAMES = {"en": "English", "de": "German"}
+
+
+class ChunkTranslator:
+    def __init__(
+        self,
+        languages: List[str] = Config.TWIN_LANGUAGES,
+        model: str = Config.TWIN_TRANSLATION_MODEL,
+        max_concurrency: int = Config.TWIN_MAX_CONCURRENCY,
+    ):
+        self.languages = languages
+        self.max_concurrency = max_concurrency
+        prompt = ChatPromptTemplate.from_template(
+            """
+            You are a helpful assistant who is an expert in translating any text to
+            {language} for the electric motor production industry.
+
+            Translate the following text to {language}, only return the translation:
+
+            {text}
+            """
+        )
+        self.chain = prompt | ChatOpenAI(model=model, temperature=0)
+
+    @staticmethod
+    def twin_id(chunk_id: str, language: str) -> str:
+        """Return the id of the translated twin of a chunk."""
+        return f"{chunk_id}:tr-{language}"
+
+    def target_languages(self, text: str) -> List[str]:
+        """Return the languages to translate the text to (none if its language can't be detected)."""
+        try:
+            language = detect(text)
+        except LangDetectException:
+            return []
+        return [target for target in self.languages if target != language]
+
+    def make_twins(self, docs: List[Document]) -> List[Document]:
+        """Translate the documents and return their twins. Documents without an id are skipped."""
+        jobs = [
+            (doc, language)
+            for doc in docs
+            if doc.id and not doc.metadata.get("twin_of")
+            for language in self.target_languages(doc.page_content)
+        ]
+        if not jobs:
+            return []
+
+        responses = self.chain.batch(
+            [
+                {"language": LANGUAGE_NAMES.get(language, language), "text": doc.page_content}
+                for doc, language in jobs
+            ],
+            config={"max_concurrency": self.max_concurrency},
+            return_exceptions=True,
+        )
+
+        twins = []
+        for (doc, language), response in zip(jobs, responses):
+            if isinstance(response, Exception) or not response.content.strip():
+                continue
+            twin_id = self.twin_id(doc.id, language)
+            twins.append(
+                Document(
+                    id=twin_id,
+                    page_content=response.content.strip(),
+                    metadata={
+                        **doc.metadata,
+                        "id": twin_id,
+                        "twin_of": doc.id,
+                        "language": language,
+                        "original_text": doc.page_content,
+                    },
+                )
+            )
+        return twins
+
+
+def backfill_twins(vectorstore_manager, translator: Optional[ChunkTranslator] = None, batch_size: int = 200) -> int:
+    """Create the missing twins of all stored chunks. Returns the number of added twins."""
+    from pdf_services.vector_storage.lexical_index import LexicalIndex
+
+    translator = translator or ChunkTranslator()
+    lexical_index = LexicalIndex()
+    added = 0
+    for store in vectorstore_manager.get_all_stores():
+        entries = store.get(include=["documents", "metadatas"])
+        existing_ids = set(entries["ids"])
+        originals = [
+            Document(id=chunk_id, page_content=document, metadata=metadata or {})
+            for chunk_id, document, metadata in zip(entries["ids"], entries["documents"], entries["metadatas"])
+            if document and not (metadata or {}).get("twin_of")
+            and not any(translator.twin_id(chunk_id, language) in existing_ids for language in translator.languages)
+        ]
+        for start in range(0, len(originals), batch_size):
+            twins = translator.make_twins(originals[start : start + batch_size])
+            vectorstore_manager.add_twins(twins, store)
+            lexical_index.add(twins)
+            added += len(twins)
+    return added
+
+
+if __name__ == "__main__":
+    from pdf_services.vector_storage.vectorstore_manager import VectorStoreManager
+
+    added = backfill_twins(VectorStoreManager(Config.CHROMA_PATH))
+    print(f"✅ Added {added} translated twins")
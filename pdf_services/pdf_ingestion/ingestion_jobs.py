@@ -0,0 +1,167 @@
+"""
+ingestion_jobs.py
+
+Background ingestion for uploaded PDFs. Uploads are turned into jobs on a
+bounded queue that a small pool of worker threads processes, so the HTTP
+request returns immediately and clients poll the job for per-stage progress.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from pdf_services.config.settings import Config
+
+
+class IngestionJob:
+    STAGES = ["parsing", "extracting_images", "summarizing_images", "embedding", "indexing"]
+
+    def __init__(self, filename: str, pdf_hash: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.pdf_hash = pdf_hash
+        self.status = "queued"
+        self.stage = None
+        self.stages = {stage: {"status": "pending", "done": 0, "total": 0} for stage in self.STAGES}
+        self.message = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Mark the job as picked up by a worker."""
+        with self._lock:
+            self.status = "running"
+            self.started_at = time.time()
+
+    def report(self, stage: str, done: int = 0, total: int = 0) -> None:
+        """Progress callback for PDFIngestionManager.start_ingest: `stage` is running, `done` of `total` items finished."""
+        with self._lock:
+            if stage != self.stage:
+                if self.stage is not None:
+                    self.stages[self.stage]["status"] = "done"
+                self.stage = stage
+            progress = self.stages.setdefault(stage, {"status": "pending", "done": 0, "total": 0})
+            progress.update(status="running", done=done, total=total)
+
+    def finish(self, message: str) -> None:
+        """Mark the job as completed with the ingestion result message."""
+        with self._lock:
+            self._close_stages()
+            self.status = "done"
+            self.message = message
+            self.finished_at = time.time()
+
+    def fail(self, error: str) -> None:
+        """Mark the job and its current stage as failed."""
+        with self._lock:
+            if self.stage is not None:
+                self.stages[self.stage]["status"] = "failed"
+            self.status = "failed"
+            self.error = error
+            self.message = "Error occurred in processing PDF! Please try again."
+            self.finished_at = time.time()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        """Return the job status as returned by the /jobs/{job_id} endpoint."""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "filename": self.filename,
+                "status": self.status,
+                "stage": self.stage,
+                "stages": {stage: dict(progress) for stage, progress in self.stages.items()},
+                "message": self.message,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+    def _close_stages(self) -> None:
+        """Mark the running stage done and stages that never ran skipped. Caller must hold the lock."""
+        for progress in self.stages.values():
+            if progress["status"] == "running":
+                progress["status"] = "done"
+            elif progress["status"] == "pending":
+                progress["status"] = "skipped"
+
+
+class IngestionJobQueue:
+    def __init__(
+        self,
+        ingestion_manager,
+        workers: int = Config.INGEST_WORKERS,
+        max_queued: int = Config.INGEST_QUEUE_SIZE,
+        history: int = Config.INGEST_JOB_HISTORY,
+    ):
+        self.ingestion_manager = ingestion_manager
+        self.history = history
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        for i in range(workers):
+            threading.Thread(target=self._work, name=f"ingest-{i}", daemon=True).start()
+
+    def submit(self, filename: str, pdf_hash: Optional[str] = None) -> IngestionJob:
+        """
+        Queue the ingestion of an uploaded file, optionally with its sha256 computed during
+        the upload. Raises queue.Full if too many jobs are waiting.
+        """
+        job = IngestionJob(filename, pdf_hash)
+        self._queue.put_nowait(job)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        return job
+
+    def has_pending(self, filename: str) -> bool:
+        """Return whether a queued or running job exists for the file."""
+        with self._lock:
+            return any(job.filename == filename and not job.finished for job in self._jobs.values())
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        """Return the job, or None if it is unknown or was evicted from the history."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _work(self) -> None:
+        """Worker loop: run queued jobs one after another."""
+        while True:
+            job = self._queue.get()
+            try:
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: IngestionJob) -> None:
+        """Ingest the file of the job, recording progress and the result."""
+        job.start()
+        try:
+            result = self.ingestion_manager.start_ingest(
+                progress=job.report,
+                filenames=[job.filename],
+                pdf_hashes={job.filename: job.pdf_hash} if job.pdf_hash else None,
+            )
+        except Exception as e:
+            job.fail(str(e))
+            return
+        if isinstance(result, dict) and "message" in result:
+            job.finish(result["message"])
+        else:
+            job.finish("PDF processed and uploaded successfully!")
+
+    def _evict(self) -> None:
+        """Forget the oldest finished jobs above the history size. Caller must hold the lock."""
+        excess = len(self._jobs) - self.history
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][: max(excess, 0)]:
+            del self._jobs[job_id]
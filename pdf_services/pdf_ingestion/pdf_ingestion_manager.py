@@ -8,10 +8,13 @@ To prevent duplicates, the script checks for new PDFs by generating a unique has
 """
 
 import hashlib
+import multiprocessing
 import os
 import shutil
+import threading
 import uuid
-from typing import List, Tuple
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
 
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
@@ -22,84 +25,295 @@ from pdf_services.config.settings import Config
 
 from pdf_services.pdf_image_handler.image_extractor import ImageExtractor
 from pdf_services.pdf_image_handler.image_summarizer import ImageSummarizer
+from pdf_services.pdf_ingestion.chunk_translator import ChunkTranslator
+from pdf_services.vector_storage.corpus_version import CorpusVersion
+from pdf_services.vector_storage.lexical_index import LexicalIndex
+from pdf_services.vector_storage.pdf_registry import PDFRegistry
 
 
 class PDFIngestionManager:
+    # Shared by all instances so folder scans and ChromaDB writes never overlap
+    _ingest_lock = threading.Lock()
+    # Uploads check the registry outside the ingest lock, so its one-time backfill has its own lock
+    _registry_lock = threading.Lock()
+
     def __init__(self, vectorstore, image_processor, dir_path=Config.PDF_FOLDER):
         self.dir_path = dir_path
         self.vectorstore = vectorstore
         self.image_processor = image_processor
+        self.corpus_version = CorpusVersion()
+        self.lexical_index = LexicalIndex()
+        self.pdf_registry = PDFRegistry()
+        self._registry_checked = False
+        self.chunk_translator = ChunkTranslator() if Config.BILINGUAL_TWINS else None
 
-    def start_ingest(self) -> None:
+    def start_ingest(
+        self,
+        progress: Optional[Callable] = None,
+        filenames: Optional[List[str]] = None,
+        pdf_hashes: Optional[Dict[str, str]] = None,
+    ) -> None:
         """
         Process PDFs and add their content (text and images) to ChromaDB vector store.
+        Concurrent calls are serialized, as each call scans the whole upload folder.
+
+        `progress(stage, done, total)` is called whenever a PDF enters an ingestion stage
+        (parsing, extracting_images, summarizing_images, embedding, indexing) or advances
+        within it. `filenames` restricts the ingest to these files of the folder instead of
+        scanning it. `pdf_hashes` maps file names to their already computed sha256, so those
+        files aren't read again for hashing.
         """
+        with self._ingest_lock:
+            return self._ingest_folder(progress, filenames, pdf_hashes or {})
+
+    @staticmethod
+    def _report(progress: Optional[Callable], stage: str, done: int = 0, total: int = 0) -> None:
+        """Forward stage progress to the callback, if any."""
+        if progress is not None:
+            progress(stage, done, total)
+
+    def _ingest_folder(
+        self,
+        progress: Optional[Callable] = None,
+        filenames: Optional[List[str]] = None,
+        pdf_hashes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Ingest every PDF currently in the folder (or the given files of it)."""
         has_new_pdf = False
-        pdf_files = [
-            filename
-            for filename in os.listdir(self.dir_path)
-            if filename.endswith(".pdf")
-        ]
+        pdf_hashes = pdf_hashes or {}
+        if filenames is None:
+            pdf_files = [filename for filename in os.listdir(self.dir_path) if filename.endswith(".pdf")]
+        else:
+            pdf_files = [
+                filename
+                for filename in filenames
+                if filename.endswith(".pdf") and os.path.isfile(os.path.join(self.dir_path, filename))
+            ]
 
         if not pdf_files:
             print("📁 No PDF files found in the directory.")
             return
 
+        pdf_files = self._drop_processed(pdf_files)
+        self._ensure_registry()
+        if Config.PARALLEL_INGEST and len(pdf_files) > 1:
+            return self._ingest_parallel(pdf_files, progress, pdf_hashes)
+
         for idx, filename in enumerate(pdf_files, start=1):
             pdf_path = os.path.join(self.dir_path, filename)
-            file_in_dest_path = os.path.join(Config.DEST_FOLDER, filename)
-            if os.path.exists(file_in_dest_path):
-                os.remove(pdf_path)
-                continue
-                # return {"message": "PDF already exists!"}
-            
-            metadata = self.extract_metadata_from_filename(filename)
             print(f"Processing PDF '{filename[:50]}': {idx}/{len(pdf_files)}")
 
-            # Load and split documents
-            documents = self.load_documents(pdf_path, metadata)
-            chunks = self.split_documents(documents)
-
-            # Get the content-based hash for the PDF
-            pdf_hash = self.generate_pdf_hash(self.get_pdf_content(pdf_path))
-
-            chunks_with_ids = self.calculate_chunk_ids(chunks, pdf_hash)
-
-            existing_ids = self.vectorstore.get_existing_ids()
+            # Get the content-based hash for the PDF and reject known PDFs before parsing
+            pdf_hash = pdf_hashes.get(filename) or self.generate_pdf_hash(self.get_pdf_content(pdf_path))
+            registered = self.pdf_registry.get(pdf_hash)
+            if registered is not None:
+                os.remove(pdf_path)
+                print(f"PDF {filename} already exists in the database.")
+                return {"message": self.duplicate_message(registered)}
 
-            new_chunks = [
-                chunk
-                for chunk in chunks_with_ids
-                if chunk.metadata["id"] not in existing_ids
-            ]
+            # Load and split documents
+            self._report(progress, "parsing")
+            metadata, new_chunks = self.parse_pdf(pdf_path, filename, pdf_hash)
 
             if new_chunks:
                 has_new_pdf = True
                 # image_extractor = ImageExtractor(pdf_path=pdf_path)
+                self._report(progress, "extracting_images")
                 images = self.image_processor.extract_images(pdf_path=pdf_path)
                 # images = image_extractor.extract_images()
                 img_base64, image_summaries = self.image_processor.summarize_images(
-                    images
+                    images,
+                    progress=lambda done, total: self._report(progress, "summarizing_images", done, total),
                 )
-
-                # Extract PDF name from path
-                pdf_name = metadata.get("title", "Unknown")
-                year = metadata.get("year", "Unknown")
-                self.vectorstore.add_to_chroma(
-                    img_base64, image_summaries, new_chunks, pdf_name, pdf_path, year
+                self._report(progress, "embedding", 0, len(new_chunks) + len(image_summaries))
+                self._store_pdf(
+                    pdf_path, filename, pdf_hash, metadata, new_chunks, img_base64, image_summaries,
+                    on_indexing=lambda: self._report(progress, "indexing"),
                 )
-                self.move_pdf_to_processed(pdf_path, filename)
             else:
                 os.remove(pdf_path)
-                print(f"PDF {filename} already exists in the database.")
-                metadata = self.vectorstore.get_source_and_title_by_id(chunks_with_ids[0].metadata.get("id"))
-                if metadata:
-                    source = metadata.get('source', '')
-                    source = os.path.basename(source)
-                    title = metadata.get('title', '')
-                    return {"message": f'PDF already exists!! with Filename: "{source}" and Title: "{title}"'}
-                return {"message": "PDF already exists !"}
+                print(f"No text found in PDF {filename}.")
+
+        return self._result_message(has_new_pdf)
+
+    def _ingest_parallel(
+        self,
+        pdf_files: List[str],
+        progress: Optional[Callable] = None,
+        pdf_hashes: Optional[Dict[str, str]] = None,
+    ) -> dict:
+        """
+        Ingest a batch of PDFs concurrently. Parsing and image extraction run in a process
+        pool, vision summaries and embeddings on INGEST_NETWORK_CONCURRENCY threads, and
+        every vector store write on a single writer thread, so Chroma is never written
+        concurrently. A PDF that fails is reported and left in the folder for a retry.
 
+        `progress(stage, done, total)` counts PDFs rather than items within one PDF.
+        """
+        paths = {filename: os.path.join(self.dir_path, filename) for filename in pdf_files}
+        total = len(pdf_files)
+        print(f"Processing {total} PDFs in parallel")
+
+        # Worker processes are spawned, not forked: this runs in a thread of a multithreaded server,
+        # and a fork would copy locks held by other threads (logging, tqdm, SQLite, HTTP clients)
+        # into the child in their locked state. Workers only read the PDF files, never the stores.
+        with ProcessPoolExecutor(
+            max_workers=min(Config.INGEST_PROCESSES, total), mp_context=multiprocessing.get_context("spawn")
+        ) as process_pool, \
+                ThreadPoolExecutor(Config.INGEST_NETWORK_CONCURRENCY, thread_name_prefix="ingest-network") as network_pool, \
+                ThreadPoolExecutor(1, thread_name_prefix="ingest-writer") as writer:
+            # Reject known PDFs, and identical PDFs within the batch, before parsing
+            hashes = {}
+            for filename in pdf_files:
+                pdf_hash = (pdf_hashes or {}).get(filename) or self.generate_pdf_hash(
+                    self.get_pdf_content(paths[filename])
+                )
+                if pdf_hash in hashes.values() or self.pdf_registry.get(pdf_hash) is not None:
+                    os.remove(paths[filename])
+                    print(f"PDF {filename} already exists in the database.")
+                else:
+                    hashes[filename] = pdf_hash
+
+            self._report(progress, "parsing", 0, len(hashes))
+            parse_futures = {
+                process_pool.submit(self.parse_pdf, paths[filename], filename, pdf_hash): filename
+                for filename, pdf_hash in hashes.items()
+            }
+            new_pdfs = {}
+            for done, future in enumerate(as_completed(parse_futures), start=1):
+                filename = parse_futures[future]
+                try:
+                    metadata, new_chunks = future.result()
+                except Exception as e:
+                    print(f"Error parsing PDF {filename}: {e}")
+                    continue
+                finally:
+                    self._report(progress, "parsing", done, len(hashes))
+                if new_chunks:
+                    new_pdfs[filename] = (metadata, new_chunks)
+                else:
+                    os.remove(paths[filename])
+                    print(f"No text found in PDF {filename}.")
+
+            self._report(progress, "extracting_images", 0, len(new_pdfs))
+            image_futures = {
+                process_pool.submit(self.image_processor.extract_images, paths[filename]): filename
+                for filename in new_pdfs
+            }
+            network_futures = {}
+            for done, future in enumerate(as_completed(image_futures), start=1):
+                filename = image_futures[future]
+                try:
+                    images = future.result()
+                except Exception as e:
+                    print(f"Error extracting images from PDF {filename}: {e}")
+                    continue
+                finally:
+                    self._report(progress, "extracting_images", done, len(new_pdfs))
+                metadata, new_chunks = new_pdfs[filename]
+                network_futures[
+                    network_pool.submit(
+                        self._summarize_and_embed,
+                        writer, paths[filename], filename, hashes[filename], metadata, new_chunks, images,
+                    )
+                ] = filename
+
+            write_futures = {}
+            for done, future in enumerate(as_completed(network_futures), start=1):
+                filename = network_futures[future]
+                try:
+                    write_futures[future.result()] = filename
+                except Exception as e:
+                    print(f"Error summarizing or embedding PDF {filename}: {e}")
+                self._report(progress, "embedding", done, len(network_futures))
+
+            stored = 0
+            for done, future in enumerate(as_completed(write_futures), start=1):
+                try:
+                    future.result()
+                    stored += 1
+                except Exception as e:
+                    print(f"Error storing PDF {write_futures[future]}: {e}")
+                self._report(progress, "indexing", done, len(write_futures))
+
+        return self._result_message(stored > 0)
+
+    def _summarize_and_embed(
+        self, writer: Executor, pdf_path: str, filename: str, pdf_hash: str, metadata: dict,
+        new_chunks: List[Document], images: list,
+    ) -> Future:
+        """
+        Network stage of the parallel ingest: summarize the images and embed all texts of the
+        PDF, then queue the PDF on the writer. Returns the writer's future.
+        """
+        img_base64, image_summaries = self.image_processor.summarize_images(images)
+        # Warm the embedding cache so the writer's add_to_chroma doesn't wait on the API
+        self.vectorstore.embeddings.embed_documents(
+            [chunk.page_content for chunk in new_chunks] + image_summaries
+        )
+        return writer.submit(
+            self._store_pdf, pdf_path, filename, pdf_hash, metadata, new_chunks, img_base64, image_summaries
+        )
+
+    def _store_pdf(
+        self, pdf_path: str, filename: str, pdf_hash: str, metadata: dict, new_chunks: List[Document],
+        img_base64: List[str], image_summaries: List[str], on_indexing: Optional[Callable] = None,
+    ) -> None:
+        """
+        Write a parsed PDF to the vector store and the lexical index, register its hash and
+        move it to the processed folder.
+        """
+        # Extract PDF name from path
+        pdf_name = metadata.get("title", "Unknown")
+        year = metadata.get("year", "Unknown")
+        added_docs = self.vectorstore.add_to_chroma(
+            img_base64, image_summaries, new_chunks, pdf_name, pdf_path, year
+        )
+        if on_indexing is not None:
+            on_indexing()
+        if self.chunk_translator is not None:
+            added_docs += self.vectorstore.add_twins(self.chunk_translator.make_twins(added_docs))
+        self.lexical_index.add(added_docs)
+        # Registered last, so a PDF whose ingestion failed midway is not rejected on retry
+        self.pdf_registry.add(pdf_hash, pdf_name, filename)
+        self.corpus_version.bump()
+        self.move_pdf_to_processed(pdf_path, filename)
+
+    def find_registered(self, pdf_hash: str) -> Optional[dict]:
+        """Return the registry entry (title, source) of an ingested PDF with this hash, or None."""
+        self._ensure_registry()
+        return self.pdf_registry.get(pdf_hash)
+
+    @staticmethod
+    def duplicate_message(registered: dict) -> str:
+        """Return the message for an upload that matches an ingested PDF."""
+        return f'PDF already exists!! with Filename: "{registered["source"]}" and Title: "{registered["title"]}"'
+
+    def _ensure_registry(self) -> None:
+        """Backfill an empty PDF registry from the chunk ids of the store (PDFs ingested before it existed)."""
+        if self._registry_checked:
+            return
+        with self._registry_lock:
+            if self._registry_checked:
+                return
+            if self.pdf_registry.count() == 0:
+                for store in self.vectorstore.get_all_stores():
+                    self.pdf_registry.rebuild(store)
+            self._registry_checked = True
+
+    def _drop_processed(self, pdf_files: List[str]) -> List[str]:
+        """Remove uploads whose file name was already processed and return the remaining files."""
+        remaining = []
+        for filename in pdf_files:
+            if os.path.exists(os.path.join(Config.DEST_FOLDER, filename)):
+                os.remove(os.path.join(self.dir_path, filename))
+            else:
+                remaining.append(filename)
+        return remaining
+
+    @staticmethod
+    def _result_message(has_new_pdf: bool) -> dict:
+        """Return the result of an ingest run."""
         print(
             "✅ Documents added successfully!"
             if has_new_pdf
@@ -139,7 +353,19 @@ class PDFIngestionManager:
 
         return {"author": author, "year": year, "title": title, "doi": doi}
 
-    def load_documents(self, pdf_path: str, metadata: dict) -> List[Document]:
+    @staticmethod
+    def parse_pdf(pdf_path: str, filename: str, pdf_hash: str) -> Tuple[dict, List[Document]]:
+        """
+        Load and split a PDF and id its chunks under the PDF hash. Returns the metadata and the
+        chunks. Static and free of instance state so it can run in a worker process.
+        """
+        metadata = PDFIngestionManager.extract_metadata_from_filename(filename)
+        documents = PDFIngestionManager.load_documents(pdf_path, metadata)
+        chunks = PDFIngestionManager.split_documents(documents)
+        return metadata, PDFIngestionManager.calculate_chunk_ids(chunks, pdf_hash)
+
+    @staticmethod
+    def load_documents(pdf_path: str, metadata: dict) -> List[Document]:
         """Load the documents from the PDF."""
         document_loader = PDFMinerLoader(pdf_path)
         documents = document_loader.load()
@@ -160,19 +386,21 @@ class PDFIngestionManager:
         """Generate a unique hash for the entire PDF."""
         return hashlib.sha256(content).hexdigest()
 
-    def split_documents(self, documents: List[Document]) -> List[Document]:
+    @staticmethod
+    def split_documents(documents: List[Document]) -> List[Document]:
         """Split the documents into chunks."""
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000, chunk_overlap=100, separators=["\n\n", "\n", "."]
         )
         return text_splitter.split_documents(documents)
 
+    @staticmethod
     def calculate_chunk_ids(
-        self, chunks: List[Document], pdf_hash: str
+        chunks: List[Document], pdf_hash: str
     ) -> List[Document]:
         """Generate unique IDs for each chunk."""
         for chunk in chunks:
-            chunk_hash = self.generate_pdf_hash(chunk.page_content.encode())
+            chunk_hash = PDFIngestionManager.generate_pdf_hash(chunk.page_content.encode())
             chunk_id = f"{pdf_hash}:{chunk_hash}"
             chunk.metadata["id"] = chunk_id
         return chunks
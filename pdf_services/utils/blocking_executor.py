@@ -0,0 +1,35 @@
+"""
+blocking_executor.py
+
+Runs blocking work (LLM and Chroma calls, file I/O, PDF ingestion) on a
+bounded thread pool so async FastAPI routes never block the event loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_services.config.settings import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide executor for blocking work, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.BLOCKING_WORKERS, thread_name_prefix="blocking"
+            )
+        return _executor
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the bounded executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), functools.partial(func, *args, **kwargs)
+    )
@@ -0,0 +1,195 @@
+"""
+cached_embeddings.py
+
+Embeddings wrapper that caches vectors in a bounded in-memory LRU backed by
+a SQLite store on disk, so repeated queries and chunks are only sent to the
+embeddings API once. Entries are keyed on the model name plus the
+normalized text. The disk store is bounded too: the least recently used
+rows above its size are pruned periodically.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from pdf_services.config.settings import Config
+
+
+class CachedEmbeddings(Embeddings):
+    _shared_instances: Dict[str, "CachedEmbeddings"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        model_name: str = Config.EMBEDDING_MODEL,
+        cache_path: str = Config.EMBEDDING_CACHE_PATH,
+        max_size: int = Config.EMBEDDING_CACHE_SIZE,
+        embeddings: Optional[Embeddings] = None,
+        max_disk_size: int = Config.EMBEDDING_CACHE_DISK_SIZE,
+    ):
+        self.model_name = model_name
+        self.embeddings = embeddings or OpenAIEmbeddings(model=model_name)
+        self.max_size = max_size
+        self.max_disk_size = max_disk_size
+        self._stored_since_prune = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(embeddings)")]
+        if "last_used" not in columns:
+            # Caches created before pruning; existing rows count as least recently used
+            self._connection.execute("ALTER TABLE embeddings ADD COLUMN last_used REAL NOT NULL DEFAULT 0")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._connection.commit()
+        self._prune()
+
+    @classmethod
+    def shared(cls, model_name: str = Config.EMBEDDING_MODEL) -> "CachedEmbeddings":
+        """Return the process-wide cached embeddings instance for the model."""
+        with cls._shared_lock:
+            if model_name not in cls._shared_instances:
+                cls._shared_instances[model_name] = cls(model_name=model_name)
+            return cls._shared_instances[model_name]
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize unicode and collapse whitespace so trivially different texts share a key."""
+        text = unicodedata.normalize("NFKC", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    def cache_key(self, text: str) -> str:
+        """Build the cache key from the model name and the normalized text."""
+        payload = f"{self.model_name}\x00{self.normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a list of texts, calling the API only for texts missing from the cache."""
+        keys = [self.cache_key(text) for text in texts]
+        vectors = self._lookup(keys)
+
+        # Embed each missing key once, even if the text appears several times
+        missing = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None and key not in missing:
+                missing[key] = text
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing.keys(), embedded)
+            }
+            self._store(new_vectors)
+            vectors = [
+                new_vectors[key] if vector is None else vector
+                for key, vector in zip(keys, vectors)
+            ]
+        return [vector.tolist() for vector in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query text."""
+        return self.embed_documents([text])[0]
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the in-memory cache size."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "model": self.model_name,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_size": len(self._memory),
+                "max_size": self.max_size,
+            }
+
+    def _lookup(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """Resolve keys from memory first, then from disk."""
+        with self._lock:
+            vectors = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                vectors.append(vector)
+
+            disk_keys = list({key for key, vector in zip(keys, vectors) if vector is None})
+            from_disk = {}
+            for start in range(0, len(disk_keys), 500):
+                batch = disk_keys[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    from_disk[key] = np.frombuffer(blob, dtype=np.float32)
+            if from_disk:
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, key) for key in from_disk]
+                )
+                self._connection.commit()
+
+            for i, key in enumerate(keys):
+                if vectors[i] is not None:
+                    continue
+                if key in from_disk:
+                    vectors[i] = from_disk[key]
+                    self._remember(key, from_disk[key])
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+            return vectors
+
+    def _store(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Write new vectors to memory and disk, pruning the disk store every 5% of its size."""
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            now = time.time()
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, vector.tobytes(), now) for key, vector in vectors.items()],
+            )
+            self._connection.commit()
+            self._stored_since_prune += len(vectors)
+            if self._stored_since_prune >= max(self.max_disk_size // 20, 1):
+                self._prune()
+
+    def _prune(self) -> None:
+        """Delete the least recently used disk entries above max_disk_size. Caller must hold the lock
+        (or be the constructor)."""
+        self._connection.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_size,),
+        )
+        self._connection.commit()
+        self._stored_since_prune = 0
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entries. Caller must hold the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
@@ -0,0 +1,91 @@
+"""
+centroid_index.py
+
+Maintains a small ChromaDB collection with one centroid vector per PDF (the
+normalized mean of its chunk and image-summary vectors). Retrieval can first
+pick the most relevant papers from this index and then search chunks only
+within those papers, keeping query cost sublinear in the corpus size.
+
+Usage (backfill the index for an existing vector store):
+    python -m pdf_services.vector_storage.centroid_index
+"""
+
+from typing import Dict, List, Optional
+
+import chromadb
+import numpy as np
+from pdf_services.config.settings import Config
+
+
+class CentroidIndex:
+    def __init__(
+        self,
+        vectorstore_path: str = Config.CHROMA_PATH,
+        collection_name: str = Config.CENTROID_COLLECTION,
+    ):
+        client = chromadb.PersistentClient(path=vectorstore_path)
+        self.collection = client.get_or_create_collection(name=collection_name)
+
+    @staticmethod
+    def compute_centroid(embeddings) -> np.ndarray:
+        """Return the unit-length mean of the unit-normalized embeddings."""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        centroid = (matrix / np.where(norms == 0, 1, norms)).mean(axis=0)
+        norm = np.linalg.norm(centroid)
+        return centroid / norm if norm else centroid
+
+    def refresh(self, chunk_collection, title: str) -> None:
+        """Recompute the centroid of a PDF from the vectors stored for its title."""
+        result = chunk_collection.get(where={"title": title}, include=["embeddings", "metadatas"])
+        if len(result["ids"]) == 0:
+            self.delete(title)
+            return
+
+        metadata = result["metadatas"][0] or {}
+        self.collection.upsert(
+            ids=[title],
+            embeddings=[self.compute_centroid(result["embeddings"]).tolist()],
+            metadatas=[
+                {
+                    "title": title,
+                    "source": metadata.get("source", "Unknown"),
+                    "year": metadata.get("year", "Unknown"),
+                    "num_chunks": len(result["ids"]),
+                }
+            ],
+        )
+
+    def rebuild(self, chunk_collection) -> int:
+        """Recompute the centroids of every PDF in the chunk collection. Returns the number of PDFs."""
+        metadatas = chunk_collection.get(include=["metadatas"])["metadatas"]
+        titles = {metadata.get("title") for metadata in metadatas if metadata and metadata.get("title")}
+        for title in titles:
+            self.refresh(chunk_collection, title)
+        return len(titles)
+
+    def delete(self, title: str) -> None:
+        """Remove the centroid of a PDF."""
+        self.collection.delete(ids=[title])
+
+    def top_titles(self, query_embedding: List[float], n: int, where: Optional[Dict] = None) -> List[str]:
+        """Return the titles of the `n` PDFs whose centroids are closest to the query."""
+        count = self.collection.count()
+        if count == 0:
+            return []
+        result = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=min(n, count),
+            where=where or None,
+            include=["metadatas"],
+        )
+        return [metadata["title"] for metadata in result["metadatas"][0] if metadata]
+
+
+if __name__ == "__main__":
+    from pdf_services.vector_storage.vectorstore_manager import VectorStoreManager
+
+    vectorstore_manager = VectorStoreManager(Config.CHROMA_PATH)
+    centroid_index = CentroidIndex()
+    num_pdfs = sum(centroid_index.rebuild(store) for store in vectorstore_manager.get_all_stores())
+    print(f"✅ Rebuilt centroids for {num_pdfs} PDFs")
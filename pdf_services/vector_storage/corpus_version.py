@@ -0,0 +1,63 @@
+"""
+corpus_version.py
+
+Keeps a monotonically increasing counter on disk that changes whenever
+documents are added to or removed from the vector store. Caches built on
+top of the corpus compare against it to detect stale entries.
+
+The counter lives in SQLite and is incremented in a single UPDATE, so
+concurrent bumps from several threads or processes (PDF service uploads,
+Scholar ingestion, PDF deletion) are never lost.
+"""
+
+import os
+import sqlite3
+import threading
+
+from pdf_services.config.settings import Config
+
+
+class CorpusVersion:
+    def __init__(self, path: str = Config.CORPUS_VERSION_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS corpus_version "
+            "(id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "INSERT OR IGNORE INTO corpus_version (id, version) VALUES (0, ?)", (self._legacy_version(),)
+        )
+
+    def _legacy_version(self) -> int:
+        """Return the counter of the former plain-text file next to the database, or 0."""
+        try:
+            with open(os.path.splitext(self.path)[0], "r") as file:
+                return int(file.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def get(self) -> int:
+        """Return the current corpus version (0 if the corpus was never changed)."""
+        with self._lock:
+            row = self._connection.execute("SELECT version FROM corpus_version WHERE id = 0").fetchone()
+        return row[0] if row else 0
+
+    def bump(self) -> int:
+        """Increment the corpus version and return the new value."""
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock before reading, so the returned value is ours
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.execute("UPDATE corpus_version SET version = version + 1 WHERE id = 0")
+                version = self._connection.execute(
+                    "SELECT version FROM corpus_version WHERE id = 0"
+                ).fetchone()[0]
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return version
@@ -0,0 +1,137 @@
+"""
+full_vector_store.py
+
+Compact side store for full-dimension embeddings, used when the ANN index only
+holds reduced-dimension vectors. Vectors are appended as float16 rows to a
+single file that is memory-mapped for reads; an SQLite table maps chunk ids to
+rows. Deleted ids are only unmapped, their rows are not reclaimed.
+
+Several processes append to the same store (PDF service, Scholar ingestion,
+PDF deletion), so every write runs inside a `BEGIN IMMEDIATE` transaction on the
+mapping database, which serializes the row offset, the file write and the mapping.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+from pdf_services.config.settings import Config
+
+
+class FullVectorStore:
+    def __init__(self, path: str = Config.FULL_VECTORS_PATH):
+        os.makedirs(path, exist_ok=True)
+        self.vectors_path = os.path.join(path, "vectors.f16")
+        self._lock = threading.Lock()
+        self._memmap = None
+        self._connection = sqlite3.connect(
+            os.path.join(path, "index.sqlite3"), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS rows (id TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    @contextmanager
+    def _write(self):
+        """Hold the thread lock and the database write lock, which also guards the vectors file across processes."""
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    @property
+    def dimensions(self) -> Optional[int]:
+        """Return the dimension of the stored vectors, or None while the store is empty."""
+        row = self._connection.execute("SELECT value FROM meta WHERE key = 'dimensions'").fetchone()
+        return int(row[0]) if row else None
+
+    def add(self, ids: List[str], vectors) -> None:
+        """Append the vectors (as float16) and map the ids to their rows."""
+        if not ids:
+            return
+        matrix = np.asarray(vectors, dtype=np.float16)
+        with self._write():
+            dimensions = self.dimensions
+            if dimensions is None:
+                dimensions = matrix.shape[1]
+                self._connection.execute(
+                    "INSERT INTO meta (key, value) VALUES ('dimensions', ?)", (str(dimensions),)
+                )
+            elif matrix.shape[1] != dimensions:
+                raise ValueError(f"Expected {dimensions}-dimensional vectors, got {matrix.shape[1]}")
+
+            # Write the rows before publishing their ids, so readers never see a missing row.
+            # Dropping a torn tail left by a crashed writer keeps every later row aligned.
+            start_row = self._num_rows(dimensions)
+            with open(self.vectors_path, "ab") as file:
+                file.truncate(start_row * dimensions * 2)
+                file.write(matrix.tobytes())
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO rows (id, row) VALUES (?, ?)",
+                [(chunk_id, start_row + i) for i, chunk_id in enumerate(ids)],
+            )
+
+    def get(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Return the float32 vectors of the ids that are stored."""
+        with self._lock:
+            rows = self._rows(ids)
+            if not rows:
+                return {}
+            vectors = self._open(max(rows.values()) + 1)
+        return {chunk_id: np.asarray(vectors[row], dtype=np.float32) for chunk_id, row in rows.items()}
+
+    def contains(self, ids: List[str]) -> Set[str]:
+        """Return the ids that are stored."""
+        with self._lock:
+            return set(self._rows(ids))
+
+    def delete(self, ids: List[str]) -> None:
+        """Unmap the ids. The rows stay in the vectors file."""
+        with self._write():
+            self._connection.executemany("DELETE FROM rows WHERE id = ?", [(chunk_id,) for chunk_id in ids])
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def _rows(self, ids: List[str]) -> Dict[str, int]:
+        """Return the rows of the ids that are stored. Caller must hold the lock."""
+        ids = list(set(ids))
+        rows = {}
+        for start in range(0, len(ids), 500):
+            batch = ids[start : start + 500]
+            placeholders = ",".join("?" for _ in batch)
+            rows.update(
+                self._connection.execute(
+                    f"SELECT id, row FROM rows WHERE id IN ({placeholders})", batch
+                ).fetchall()
+            )
+        return rows
+
+    def _num_rows(self, dimensions: int) -> int:
+        """Return the number of rows in the vectors file."""
+        if not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (dimensions * 2)
+
+    def _open(self, min_rows: int) -> np.memmap:
+        """Return the memory map, remapping once the file has grown past it. Caller must hold the lock."""
+        if self._memmap is None or self._memmap.shape[0] < min_rows:
+            dimensions = self.dimensions
+            self._memmap = np.memmap(
+                self.vectors_path,
+                dtype=np.float16,
+                mode="r",
+                shape=(self._num_rows(dimensions), dimensions),
+            )
+        return self._memmap
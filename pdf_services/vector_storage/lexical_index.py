@@ -0,0 +1,159 @@
+"""
+lexical_index.py
+
+Local BM25 inverted index over the same chunks (and chunk ids) as the vector
+store, kept in an SQLite FTS5 table. Dense retrieval tends to miss exact terms
+such as part numbers, alloy names and acronyms; lexical hits are fused with
+the dense results at query time.
+
+Usage (backfill the index from an existing vector store):
+    python -m pdf_services.vector_storage.lexical_index
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+from pdf_services.config.settings import Config
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# English and German function words; they match nearly every chunk and only add noise to BM25
+STOPWORDS = frozenset(
+    """
+    a about an and are as at be been but by can could did do does for from had has have how i if in
+    into is it its me my of on or our should so than that the their them then there these they this
+    those to was we were what when where which who why will with would you your
+    aber als am an auch auf aus bei bin bis bist da dann das dass dem den der des die dies diese
+    dieser dir doch du durch ein eine einem einen einer eines er es für gibt hat hatte ich ihr im in
+    ist ja kann mit nach nicht noch nur ob oder sich sie sind so über um und uns von vor war was
+    welche welcher wenn wer werden wie wir wird wo zu zum zur
+    """.split()
+)
+
+
+class LexicalIndex:
+    def __init__(self, path: str = Config.LEXICAL_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # FTS5 can't look rows up by an unindexed column, so chunk ids map to FTS rowids here
+        self._connection.execute("CREATE TABLE IF NOT EXISTS chunk_ids (id TEXT PRIMARY KEY)")
+        self._connection.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+            "id UNINDEXED, title UNINDEXED, year UNINDEXED, metadata UNINDEXED, content, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split text into lowercase word tokens."""
+        return [token.lower() for token in TOKEN_PATTERN.findall(text)]
+
+    @classmethod
+    def query_terms(cls, text: str) -> List[str]:
+        """Return the distinct tokens of a query without stopwords, or all of them if only stopwords remain."""
+        terms = list(dict.fromkeys(cls.tokenize(text)))
+        return [term for term in terms if term not in STOPWORDS] or terms
+
+    def add(self, docs: List[Document]) -> None:
+        """Index the documents under their ids, replacing earlier versions of the same ids."""
+        rows = [
+            (
+                doc.id,
+                doc.metadata.get("title"),
+                doc.metadata.get("year"),
+                json.dumps(doc.metadata, default=str),
+                doc.page_content,
+            )
+            for doc in docs
+            if doc.id and doc.page_content
+        ]
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._connection.execute("INSERT OR IGNORE INTO chunk_ids (id) VALUES (?)", (row[0],))
+                rowid = self._connection.execute(
+                    "SELECT rowid FROM chunk_ids WHERE id = ?", (row[0],)
+                ).fetchone()[0]
+                self._connection.execute("DELETE FROM chunks WHERE rowid = ?", (rowid,))
+                self._connection.execute(
+                    "INSERT INTO chunks (rowid, id, title, year, metadata, content) VALUES (?, ?, ?, ?, ?, ?)",
+                    (rowid, *row),
+                )
+            self._connection.commit()
+
+    def delete_title(self, title: str) -> None:
+        """Remove all chunks of a PDF."""
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM chunk_ids WHERE rowid IN (SELECT rowid FROM chunks WHERE title = ?)", (title,)
+            )
+            self._connection.execute("DELETE FROM chunks WHERE title = ?", (title,))
+            self._connection.commit()
+
+    def count(self) -> int:
+        """Return the number of indexed chunks."""
+        return self._connection.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def search(
+        self, query: str, k: int, year_range: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Return up to k (document, BM25 score) pairs, best first. Higher scores are better."""
+        terms = self.query_terms(query)
+        if not terms:
+            return []
+        # Quote every term so FTS5 operators in user text are matched literally; any term may match
+        match_query = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+        sql = "SELECT id, metadata, content, bm25(chunks) FROM chunks WHERE chunks MATCH ?"
+        params = [match_query]
+        if year_range is not None:
+            sql += " AND year BETWEEN ? AND ?"
+            params.extend(year_range)
+        sql += " ORDER BY bm25(chunks) LIMIT ?"
+        params.append(k)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        # FTS5 reports BM25 as a negative number (lower is better)
+        return [
+            (Document(id=chunk_id, page_content=content, metadata=json.loads(metadata)), -score)
+            for chunk_id, metadata, content, score in rows
+        ]
+
+    def rebuild(self, chunk_collection, batch_size: int = 1000) -> int:
+        """Index every entry of a chunk collection. Returns the number of indexed entries."""
+        total = 0
+        offset = 0
+        while True:
+            batch = chunk_collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            if len(batch["ids"]) == 0:
+                break
+            self.add(
+                [
+                    Document(id=chunk_id, page_content=document or "", metadata=metadata or {})
+                    for chunk_id, document, metadata in zip(
+                        batch["ids"], batch["documents"], batch["metadatas"]
+                    )
+                ]
+            )
+            offset += len(batch["ids"])
+            total += len(batch["ids"])
+        return total
+
+
+if __name__ == "__main__":
+    from pdf_services.vector_storage.vectorstore_manager import VectorStoreManager
+
+    vectorstore_manager = VectorStoreManager(Config.CHROMA_PATH)
+    lexical_index = LexicalIndex()
+    total = sum(lexical_index.rebuild(store) for store in vectorstore_manager.get_all_stores())
+    print(f"✅ Indexed {total} chunks, {lexical_index.count()} in the lexical index")
@@ -0,0 +1,108 @@
+"""
+pdf_registry.py
+
+Persistent registry of ingested PDFs keyed by the sha256 of the file content
+(the same hash that prefixes every chunk id, "{pdf_hash}:{chunk_hash}"). Uploads
+are checked against it before any parsing, so a duplicate is rejected with one
+indexed lookup instead of parsing the PDF and scanning every id in the store.
+
+Usage (backfill the registry from the chunk ids of an existing vector store):
+    python -m pdf_services.vector_storage.pdf_registry
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from pdf_services.config.settings import Config
+
+PDF_HASH_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class PDFRegistry:
+    def __init__(self, path: str = Config.PDF_REGISTRY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS pdfs ("
+            "hash TEXT PRIMARY KEY, title TEXT, source TEXT, added_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS pdfs_title ON pdfs (title)")
+        self._connection.commit()
+
+    def get(self, pdf_hash: str) -> Optional[dict]:
+        """Return the title and source file name registered for the hash, or None if it is unknown."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT title, source FROM pdfs WHERE hash = ?", (pdf_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"title": row[0], "source": row[1]}
+
+    def add(self, pdf_hash: str, title: str, source: str) -> None:
+        """Register an ingested PDF. `source` is the file name the PDF was uploaded as."""
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pdfs (hash, title, source, added_at) VALUES (?, ?, ?, ?)",
+                (pdf_hash, title, os.path.basename(source), time.time()),
+            )
+            self._connection.commit()
+
+    def delete_title(self, title: str) -> None:
+        """Forget all PDFs registered under the title."""
+        with self._lock:
+            self._connection.execute("DELETE FROM pdfs WHERE title = ?", (title,))
+            self._connection.commit()
+
+    def count(self) -> int:
+        """Return the number of registered PDFs."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pdfs").fetchone()[0]
+
+    def rebuild(self, chunk_collection, batch_size: int = 1000) -> int:
+        """Register every PDF of a chunk collection from its chunk ids. Returns the number of PDFs found.
+
+        Only ids starting with a sha256 are counted; image summaries (uuid ids) and the translated
+        twins of any entry ("{id}:tr-{lang}") are skipped.
+        """
+        found = {}
+        offset = 0
+        while True:
+            batch = chunk_collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            if len(batch["ids"]) == 0:
+                break
+            for chunk_id, metadata in zip(batch["ids"], batch["metadatas"]):
+                pdf_hash = chunk_id.split(":", 1)[0]
+                if ":tr-" in chunk_id or not PDF_HASH_PATTERN.fullmatch(pdf_hash):
+                    continue
+                if pdf_hash not in found:
+                    metadata = metadata or {}
+                    found[pdf_hash] = (metadata.get("title", "Unknown"), metadata.get("source", ""))
+            offset += len(batch["ids"])
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO pdfs (hash, title, source, added_at) VALUES (?, ?, ?, ?)",
+                [
+                    (pdf_hash, title, os.path.basename(source), time.time())
+                    for pdf_hash, (title, source) in found.items()
+                ],
+            )
+            self._connection.commit()
+        return len(found)
+
+
+if __name__ == "__main__":
+    from pdf_services.vector_storage.vectorstore_manager import VectorStoreManager
+
+    vectorstore_manager = VectorStoreManager(Config.CHROMA_PATH)
+    registry = PDFRegistry()
+    for store in vectorstore_manager.get_all_stores():
+        registry.rebuild(store)
+    print(f"✅ {registry.count()} PDFs in the registry")
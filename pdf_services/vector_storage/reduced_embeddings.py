@@ -0,0 +1,200 @@
+"""
+reduced_embeddings.py
+
+Two-stage vector search support: the ANN index stores reduced-dimension
+embeddings, and the top candidates are rescored exactly against the full
+vectors kept in a FullVectorStore.
+
+text-embedding-3 vectors can be shortened by keeping their leading dimensions
+and re-normalizing (this is what the API's `dimensions` parameter does), so the
+reduced vectors are derived from the cached full-dimension ones instead of
+being requested from the API a second time.
+
+Usage:
+    # Copy the existing store into a reduced-dimension store plus the full-vector side store
+    python -m pdf_services.vector_storage.reduced_embeddings migrate --dimensions 256 --target data/pdf_embeddings_256d
+
+    # Compare recall and latency of candidate dimensions against exact full-dimension search
+    python -m pdf_services.vector_storage.reduced_embeddings benchmark --dimensions 128 256 512 1024
+"""
+
+import argparse
+import time
+from typing import List, Optional
+
+import chromadb
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from pdf_services.config.settings import Config
+from pdf_services.vector_storage.cached_embeddings import CachedEmbeddings
+from pdf_services.vector_storage.centroid_index import CentroidIndex
+from pdf_services.vector_storage.full_vector_store import FullVectorStore
+
+
+class ReducedEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, dimensions: int):
+        self.embeddings = embeddings
+        self.dimensions = dimensions
+
+    @staticmethod
+    def reduce(vectors, dimensions: Optional[int]) -> np.ndarray:
+        """Keep the leading dimensions of the vectors (all if None) and re-normalize them to unit length."""
+        matrix = np.asarray(vectors, dtype=np.float32)[:, :dimensions]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed the texts and return their reduced vectors."""
+        return self.reduce(self.embeddings.embed_documents(texts), self.dimensions).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query text and return its reduced vector."""
+        return self.embed_documents([text])[0]
+
+
+def _vector_collections(client) -> List[str]:
+    """Return the names of the chunk collections (the single collection and any year partitions)."""
+    names = [
+        collection if isinstance(collection, str) else collection.name
+        for collection in client.list_collections()
+    ]
+    return [name for name in names if name == "multi_modal_rag" or name.startswith("multi_modal_rag__")]
+
+
+def migrate(
+    dimensions: int,
+    target_path: str,
+    source_path: str = Config.CHROMA_PATH,
+    full_vectors_path: str = Config.FULL_VECTORS_PATH,
+    batch_size: int = 500,
+) -> int:
+    """Copy the full-dimension store into a reduced-dimension store and the full-vector side store.
+
+    Returns the number of migrated entries. The stored vectors are reused, so nothing is re-embedded.
+    """
+    source = chromadb.PersistentClient(path=source_path)
+    target = chromadb.PersistentClient(path=target_path)
+    full_vectors = FullVectorStore(full_vectors_path)
+    centroid_index = CentroidIndex(target_path)
+
+    total = 0
+    for name in _vector_collections(source):
+        collection = source.get_collection(name=name)
+        target_collection = target.get_or_create_collection(name=name)
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            if len(batch["ids"]) == 0:
+                break
+            # Re-running the migration must not append the same vectors again
+            stored = full_vectors.contains(batch["ids"])
+            new = [i for i, chunk_id in enumerate(batch["ids"]) if chunk_id not in stored]
+            full_vectors.add([batch["ids"][i] for i in new], [batch["embeddings"][i] for i in new])
+            target_collection.upsert(
+                ids=batch["ids"],
+                embeddings=ReducedEmbeddings.reduce(batch["embeddings"], dimensions).tolist(),
+                documents=batch["documents"],
+                metadatas=batch["metadatas"],
+            )
+            offset += len(batch["ids"])
+        centroid_index.rebuild(target_collection)
+        total += offset
+    return total
+
+
+def benchmark(
+    dimensions: List[int],
+    source_path: str = Config.CHROMA_PATH,
+    num_queries: int = 100,
+    k: int = 10,
+    candidate_k: int = 50,
+    query_file: Optional[str] = None,
+) -> None:
+    """Print recall@k and latency of reduced-dimension ANN search plus full-dimension rescoring.
+
+    The ground truth is exact full-dimension search. Queries are read from `query_file` (one per
+    line) or, without a file, sampled from the stored chunk vectors.
+    """
+    source = chromadb.PersistentClient(path=source_path)
+    embeddings = []
+    for name in _vector_collections(source):
+        embeddings.extend(source.get_collection(name=name).get(include=["embeddings"])["embeddings"])
+    full = ReducedEmbeddings.reduce(embeddings, None)
+    full_float16 = full.astype(np.float16)
+
+    if query_file:
+        with open(query_file, encoding="utf-8") as file:
+            texts = [line.strip() for line in file if line.strip()]
+        queries = ReducedEmbeddings.reduce(CachedEmbeddings.shared().embed_documents(texts), None)
+    else:
+        rng = np.random.default_rng(0)
+        queries = full[rng.choice(len(full), size=min(num_queries, len(full)), replace=False)]
+    truth = [set(np.argsort(-(full @ query))[:k].tolist()) for query in queries]
+
+    client = chromadb.EphemeralClient()
+    print(f"{len(full)} vectors, {len(queries)} queries, recall@{k} with {candidate_k} candidates")
+    print(f"{'dims':>6} {'recall':>8} {'p50 ms':>8} {'p95 ms':>8} {'index MB':>9}")
+    for dims in dimensions:
+        bench_collection = client.create_collection(name=f"benchmark_{dims}")
+        reduced = ReducedEmbeddings.reduce(full, dims)
+        for start in range(0, len(reduced), 1000):
+            rows = range(start, min(start + 1000, len(reduced)))
+            bench_collection.add(
+                ids=[str(row) for row in rows], embeddings=reduced[start : rows.stop].tolist()
+            )
+
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            result = bench_collection.query(
+                query_embeddings=[ReducedEmbeddings.reduce([query], dims)[0].tolist()],
+                n_results=min(candidate_k, len(full)),
+                include=[],
+            )
+            rows = [int(row) for row in result["ids"][0]]
+            scores = full_float16[rows].astype(np.float32) @ query
+            top = {rows[i] for i in np.argsort(-scores)[:k]}
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(top & expected) / len(expected))
+
+        index_mb = len(full) * dims * 4 / 1024 / 1024
+        print(
+            f"{dims:>6} {np.mean(recalls):>8.3f} {np.percentile(latencies, 50):>8.2f} "
+            f"{np.percentile(latencies, 95):>8.2f} {index_mb:>9.1f}"
+        )
+        client.delete_collection(name=f"benchmark_{dims}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reduced-dimension vector index tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Build a reduced-dimension copy of the store.")
+    migrate_parser.add_argument("--dimensions", type=int, required=True)
+    migrate_parser.add_argument("--target", required=True, help="Directory of the new Chroma store.")
+    migrate_parser.add_argument("--source", default=Config.CHROMA_PATH)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Measure recall and latency per dimension.")
+    benchmark_parser.add_argument("--dimensions", type=int, nargs="+", default=[128, 256, 512, 1024])
+    benchmark_parser.add_argument("--source", default=Config.CHROMA_PATH)
+    benchmark_parser.add_argument("--queries", type=int, default=100)
+    benchmark_parser.add_argument("--k", type=int, default=10)
+    benchmark_parser.add_argument("--candidates", type=int, default=50)
+    benchmark_parser.add_argument("--query-file")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        total = migrate(args.dimensions, args.target, source_path=args.source)
+        print(f"✅ Migrated {total} entries to {args.target} ({args.dimensions} dimensions)")
+        print("Set REDUCED_DIMENSIONS and CHROMA_PATH in both configs to serve from the new store.")
+    else:
+        benchmark(
+            args.dimensions,
+            source_path=args.source,
+            num_queries=args.queries,
+            k=args.k,
+            candidate_k=args.candidates,
+            query_file=args.query_file,
+        )
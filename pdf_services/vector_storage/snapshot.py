@@ -0,0 +1,311 @@
+"""
+snapshot.py
+
+Read-only export of the vector store for query replicas. Each export is
+written to its own version directory:
+
+    <root>/v<N>/embeddings.npy      contiguous float16/float32 matrix, memory-mapped on load
+    <root>/v<N>/metadata.json.gz    ids, documents and one column per metadata key
+    <root>/v<N>/manifest.json       version, corpus version, count, dimensions, dtype, model
+    <root>/CURRENT                  name of the version directory to serve
+
+CURRENT is replaced atomically once a version is complete, so readers never
+see a partial export. Query workers search the memory-mapped matrix exactly
+in-process and share one page-cached copy without a Chroma process; a new
+replica only needs a copy of the directory.
+
+Usage:
+    python -m pdf_services.vector_storage.snapshot [--dtype float32] [--keep 2]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import chromadb
+import numpy as np
+from langchain_core.documents import Document
+from pdf_services.config.settings import Config
+from pdf_services.vector_storage.corpus_version import CorpusVersion
+from pdf_services.vector_storage.full_vector_store import FullVectorStore
+
+SNAPSHOT_FORMAT = 1
+UNKNOWN_YEAR = -1
+
+
+def _chunk_collections(client) -> List[str]:
+    """Return the names of the chunk collections (the single collection and any year partitions)."""
+    names = [
+        collection if isinstance(collection, str) else collection.name
+        for collection in client.list_collections()
+    ]
+    return [name for name in names if name == "multi_modal_rag" or name.startswith("multi_modal_rag__")]
+
+
+def export_snapshot(
+    root: str = Config.SNAPSHOT_PATH,
+    chroma_path: str = Config.CHROMA_PATH,
+    dtype: str = Config.SNAPSHOT_DTYPE,
+    keep: int = 2,
+    batch_size: int = 1000,
+) -> dict:
+    """Export all chunk collections into a new snapshot version and make it current. Returns the manifest.
+
+    With REDUCED_DIMENSIONS, the full vectors are taken from the FullVectorStore so the snapshot
+    always holds full-dimension embeddings.
+    """
+    client = chromadb.PersistentClient(path=chroma_path)
+    full_vectors = FullVectorStore(Config.FULL_VECTORS_PATH) if Config.REDUCED_DIMENSIONS else None
+
+    ids, documents, metadatas, embeddings = [], [], [], []
+    seen_ids = set()
+    for name in _chunk_collections(client):
+        collection = client.get_collection(name=name)
+        offset = 0
+        while True:
+            batch = collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            if len(batch["ids"]) == 0:
+                break
+            offset += len(batch["ids"])
+
+            vectors = batch["embeddings"]
+            if full_vectors is not None:
+                stored = full_vectors.get(batch["ids"])
+                missing = [chunk_id for chunk_id in batch["ids"] if chunk_id not in stored]
+                if missing:
+                    raise ValueError(f"{len(missing)} entries have no full vector, e.g. {missing[0]}")
+                vectors = [stored[chunk_id] for chunk_id in batch["ids"]]
+
+            for i, chunk_id in enumerate(batch["ids"]):
+                # The single collection may still hold copies of migrated partitions
+                if chunk_id in seen_ids:
+                    continue
+                seen_ids.add(chunk_id)
+                ids.append(chunk_id)
+                documents.append(batch["documents"][i])
+                metadatas.append(batch["metadatas"][i] or {})
+                embeddings.append(np.asarray(vectors[i], dtype=np.float32))
+
+    if not ids:
+        raise ValueError(f"No embeddings found in {chroma_path}")
+
+    matrix = np.stack(embeddings)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+
+    os.makedirs(root, exist_ok=True)
+    version = max([_version_number(name) for name in os.listdir(root)] + [0]) + 1
+    version_name = f"v{version}"
+    version_dir = os.path.join(root, version_name)
+    os.makedirs(version_dir)
+
+    np.save(os.path.join(version_dir, "embeddings.npy"), matrix.astype(dtype))
+
+    keys = sorted({key for metadata in metadatas for key in metadata})
+    columns = {
+        "ids": ids,
+        "documents": documents,
+        "metadata": {key: [metadata.get(key) for metadata in metadatas] for key in keys},
+    }
+    with gzip.open(os.path.join(version_dir, "metadata.json.gz"), "wt", encoding="utf-8") as file:
+        json.dump(columns, file)
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "corpus_version": CorpusVersion().get(),
+        "count": len(ids),
+        "dimensions": int(matrix.shape[1]),
+        "dtype": dtype,
+        "embedding_model": Config.EMBEDDING_MODEL,
+    }
+    with open(os.path.join(version_dir, "manifest.json"), "w") as file:
+        json.dump(manifest, file, indent=2)
+
+    # Publish the new version, then drop the oldest ones
+    tmp_path = os.path.join(root, f"CURRENT.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as file:
+        file.write(version_name)
+    os.replace(tmp_path, os.path.join(root, "CURRENT"))
+
+    old_versions = sorted(
+        (name for name in os.listdir(root) if _version_number(name)), key=_version_number
+    )[: -max(keep, 1)]
+    for name in old_versions:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return manifest
+
+
+def _version_number(name: str) -> int:
+    """Return N for a version directory named vN, else 0."""
+    if name.startswith("v") and name[1:].isdigit():
+        return int(name[1:])
+    return 0
+
+
+class SnapshotVersion(NamedTuple):
+    """One loaded snapshot version. Replaced as a whole on reload, never modified."""
+
+    name: str
+    manifest: dict
+    embeddings: np.ndarray
+    years: np.ndarray
+    ids: List[str]
+    documents: List[str]
+    metadata_columns: Dict[str, list]
+    rows: Dict[str, int]
+
+    def document(self, row: int) -> Document:
+        """Build the Document of a row."""
+        metadata = {
+            key: column[row] for key, column in self.metadata_columns.items() if column[row] is not None
+        }
+        return Document(id=self.ids[row], page_content=self.documents[row], metadata=metadata)
+
+
+class VectorSnapshot:
+    """Serves exact similarity search from the current snapshot version."""
+
+    _shared_instances: Dict[str, "VectorSnapshot"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root: str = Config.SNAPSHOT_PATH, block_size: int = 65536):
+        self.root = root
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._version = None
+        if not self.exists(root):
+            raise FileNotFoundError(
+                f"No vector snapshot in {root}, export one with `python -m pdf_services.vector_storage.snapshot`"
+            )
+        self.refresh()
+
+    @staticmethod
+    def exists(root: str) -> bool:
+        """Return whether a snapshot version was published in the directory."""
+        return os.path.isfile(os.path.join(root, "CURRENT"))
+
+    @classmethod
+    def shared(cls, root: str = Config.SNAPSHOT_PATH) -> "VectorSnapshot":
+        """Return the process-wide snapshot reader for the directory."""
+        with cls._shared_lock:
+            if root not in cls._shared_instances:
+                cls._shared_instances[root] = cls(root)
+            return cls._shared_instances[root]
+
+    @property
+    def manifest(self) -> dict:
+        """Manifest of the loaded version."""
+        return self._current().manifest
+
+    def refresh(self) -> None:
+        """Load the current version if CURRENT points to a different one than the loaded version.
+
+        If CURRENT can't be read, the loaded version keeps being served.
+        """
+        try:
+            with open(os.path.join(self.root, "CURRENT")) as file:
+                version_name = file.read().strip()
+        except OSError:
+            if self._version is not None:
+                return
+            raise
+        if self._version is not None and version_name == self._version.name:
+            return
+        with self._refresh_lock:
+            if self._version is None or version_name != self._version.name:
+                self._load(version_name)
+
+    def _current(self) -> SnapshotVersion:
+        """Return the loaded version; callers must use only this object for one operation."""
+        with self._lock:
+            return self._version
+
+    def _load(self, version_name: str) -> None:
+        """Load a snapshot version. Caller must hold the refresh lock."""
+        version_dir = os.path.join(self.root, version_name)
+        with open(os.path.join(version_dir, "manifest.json")) as file:
+            manifest = json.load(file)
+        with gzip.open(os.path.join(version_dir, "metadata.json.gz"), "rt", encoding="utf-8") as file:
+            columns = json.load(file)
+        embeddings = np.load(os.path.join(version_dir, "embeddings.npy"), mmap_mode="r")
+        years = np.array(
+            [_year_or_unknown(year) for year in columns["metadata"].get("year", [None] * len(columns["ids"]))],
+            dtype=np.int32,
+        )
+
+        version = SnapshotVersion(
+            name=version_name,
+            manifest=manifest,
+            embeddings=embeddings,
+            years=years,
+            ids=columns["ids"],
+            documents=columns["documents"],
+            metadata_columns=columns["metadata"],
+            rows={chunk_id: row for row, chunk_id in enumerate(columns["ids"])},
+        )
+        with self._lock:
+            self._version = version
+
+    def search(
+        self, query_embedding: List[float], k: int, year_range: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Return the k most similar (document, cosine similarity) pairs, optionally within a year range."""
+        self.refresh()
+        # Score and build documents from one version, even if a reload swaps it meanwhile
+        version = self._current()
+        embeddings, years = version.embeddings, version.years
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_vector = query_vector / (np.linalg.norm(query_vector) or 1)
+
+        # Score block by block so float16 rows are converted in bounded chunks
+        scores = np.empty(len(embeddings), dtype=np.float32)
+        for start in range(0, len(embeddings), self.block_size):
+            block = np.asarray(embeddings[start : start + self.block_size], dtype=np.float32)
+            scores[start : start + len(block)] = block @ query_vector
+        if year_range is not None:
+            scores[(years < year_range[0]) | (years > year_range[1])] = -np.inf
+
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(version.document(int(row)), float(scores[row])) for row in top]
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Return the float32 vectors of the ids contained in the snapshot."""
+        version = self._current()
+        return {
+            chunk_id: np.asarray(version.embeddings[version.rows[chunk_id]], dtype=np.float32)
+            for chunk_id in ids
+            if chunk_id in version.rows
+        }
+
+
+def _year_or_unknown(year) -> int:
+    """Return the year as an int, or UNKNOWN_YEAR if it is missing or unknown."""
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return UNKNOWN_YEAR
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a read-only vector snapshot for query replicas.")
+    parser.add_argument("--root", default=Config.SNAPSHOT_PATH)
+    parser.add_argument("--dtype", choices=["float16", "float32"], default=Config.SNAPSHOT_DTYPE)
+    parser.add_argument("--keep", type=int, default=2, help="Number of versions to keep.")
+    args = parser.parse_args()
+
+    manifest = export_snapshot(root=args.root, dtype=args.dtype, keep=args.keep)
+    print(f"✅ Exported snapshot v{manifest['version']} with {manifest['count']} entries to {args.root}")
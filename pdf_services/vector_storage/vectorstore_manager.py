@@ -1,32 +1,59 @@
 import uuid
-from typing import List
+from typing import List, Optional
 
 from langchain_core.documents import Document
 from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
 from pdf_services.config.settings import Config
+from pdf_services.vector_storage.cached_embeddings import CachedEmbeddings
+from pdf_services.vector_storage.centroid_index import CentroidIndex
+from pdf_services.vector_storage.full_vector_store import FullVectorStore
+from pdf_services.vector_storage.reduced_embeddings import ReducedEmbeddings
+from pdf_services.vector_storage.year_partitions import YearPartitions
 
 
 class VectorStoreManager:
     def __init__(self, vectorstore_path: str = Config.CHROMA_PATH):
+        self.vectorstore_path = vectorstore_path
+        self.embeddings = CachedEmbeddings.shared(Config.EMBEDDING_MODEL)
+        if Config.REDUCED_DIMENSIONS:
+            # The index gets reduced vectors, the full ones go to the side store for rescoring
+            self.index_embeddings = ReducedEmbeddings(self.embeddings, Config.REDUCED_DIMENSIONS)
+            self.full_vectors = FullVectorStore(Config.FULL_VECTORS_PATH)
+        else:
+            self.index_embeddings = self.embeddings
+            self.full_vectors = None
         self.vectorstore = Chroma(
             collection_name="multi_modal_rag",
-            embedding_function=OpenAIEmbeddings(model="text-embedding-3-large"),
+            embedding_function=self.index_embeddings,
             persist_directory=vectorstore_path,
         )
+        self.centroid_index = CentroidIndex(vectorstore_path)
+        self.partitions = YearPartitions(vectorstore_path) if Config.YEAR_PARTITIONED else None
+        self._partition_stores = {}
 
-    def get_existing_ids(self) -> set:
-        """Get existing IDs from the ChromaDB."""
-        existing_items = self.vectorstore.get(include=[])
-        return set(existing_items["ids"])
-    
-    def get_source_and_title_by_id(self, chunk_id):
-        result = self.vectorstore.get(ids=[chunk_id])
-        if result['metadatas']:
-            metadata = result['metadatas'][0]  # The metadata for the first result
-            return metadata
-        else:
-            return None
+    def get_store_for_year(self, year) -> Chroma:
+        """Return the collection that stores PDFs of the given year."""
+        if self.partitions is None:
+            return self.vectorstore
+        return self._get_partition_store(self.partitions.collection_for_year(year))
+
+    def get_all_stores(self) -> List[Chroma]:
+        """Return the single collection and, in the partitioned layout, every year partition."""
+        if self.partitions is None:
+            return [self.vectorstore]
+        return [self.vectorstore] + [
+            self._get_partition_store(name) for name in self.partitions.list_partitions()
+        ]
+
+    def _get_partition_store(self, name: str) -> Chroma:
+        """Return the (cached) Chroma wrapper of a partition collection."""
+        if name not in self._partition_stores:
+            self._partition_stores[name] = Chroma(
+                collection_name=name,
+                embedding_function=self.index_embeddings,
+                persist_directory=self.vectorstore_path,
+            )
+        return self._partition_stores[name]
 
     def add_to_chroma(
         self,
@@ -36,8 +63,11 @@ class VectorStoreManager:
         pdf_name: str,
         source_path: str,
         year: int,
-    ) -> None:
-        """Add new chunks and images to ChromaDB."""
+    ) -> List[Document]:
+        """Add new chunks and images to ChromaDB and refresh the centroid of the PDF.
+
+        Returns the added documents with their ids set.
+        """
 
         seen_chunk_ids = set()
         unique_chunks = []
@@ -50,25 +80,56 @@ class VectorStoreManager:
                 seen_chunk_ids.add(chunk_id)
                 unique_chunks.append(chunk)
 
+        store = self.get_store_for_year(year)
+
         # Adding text chunks
-        self.vectorstore.add_documents(
-            unique_chunks, ids=[chunk.metadata["id"] for chunk in unique_chunks]
-        )
+        chunk_ids = [chunk.metadata["id"] for chunk in unique_chunks]
+        for chunk in unique_chunks:
+            chunk.id = chunk.metadata["id"]
+        self._add_full_vectors(chunk_ids, [chunk.page_content for chunk in unique_chunks])
+        store.add_documents(unique_chunks, ids=chunk_ids)
+
+        added_docs = list(unique_chunks)
 
         # Adding image summaries
-        if not img_base64:
-            return
-        img_ids = [str(uuid.uuid4()) for _ in img_base64]
-        summary_img = [
-            Document(
-                page_content=s,
-                metadata={
-                    "doc_id": img_ids[i],
-                    "title": pdf_name,
-                    "source": source_path,
-                    "year": year,
-                },
-            )
-            for i, s in enumerate(image_summaries)
-        ]
-        self.vectorstore.add_documents(summary_img)
+        if img_base64:
+            img_ids = [str(uuid.uuid4()) for _ in image_summaries]
+            summary_img = [
+                Document(
+                    id=img_ids[i],
+                    page_content=s,
+                    metadata={
+                        "doc_id": img_ids[i],
+                        "title": pdf_name,
+                        "source": source_path,
+                        "year": year,
+                    },
+                )
+                for i, s in enumerate(image_summaries)
+            ]
+            self._add_full_vectors(img_ids, image_summaries)
+            store.add_documents(summary_img, ids=img_ids)
+            added_docs.extend(summary_img)
+
+        # Keep the per-PDF centroid used for two-level retrieval in sync
+        self.centroid_index.refresh(store, pdf_name)
+        return added_docs
+
+    def add_twins(self, twins: List[Document], store: Optional[Chroma] = None) -> List[Document]:
+        """Add translated twins next to their original chunks and refresh the affected centroids."""
+        if not twins:
+            return []
+        if store is None:
+            store = self.get_store_for_year(twins[0].metadata.get("year"))
+        twin_ids = [twin.id for twin in twins]
+        self._add_full_vectors(twin_ids, [twin.page_content for twin in twins])
+        store.add_documents(twins, ids=twin_ids)
+        for title in {twin.metadata.get("title") for twin in twins if twin.metadata.get("title")}:
+            self.centroid_index.refresh(store, title)
+        return twins
+
+    def _add_full_vectors(self, ids: List[str], texts: List[str]) -> None:
+        """Store the full-dimension vectors used for rescoring when the index holds reduced ones."""
+        if self.full_vectors is not None and ids:
+            # Embeddings are cached, so indexing the same texts afterwards costs no extra API call
+            self.full_vectors.add(ids, self.embeddings.embed_documents(texts))
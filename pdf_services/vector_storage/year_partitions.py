@@ -0,0 +1,122 @@
+"""
+year_partitions.py
+
+Optional layout that shards the vector store into one ChromaDB collection per
+year bucket (e.g. `multi_modal_rag__2015_2019`, plus `multi_modal_rag__unknown`
+for PDFs without a year). Year-filtered searches then only query the buckets
+overlapping the requested range instead of post-filtering one large index.
+
+Usage (copy an existing single-collection store into partitions):
+    python -m pdf_services.vector_storage.year_partitions [--drop-source]
+"""
+
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import chromadb
+from pdf_services.config.settings import Config
+
+UNKNOWN_PARTITION = "unknown"
+
+
+class YearPartitions:
+    def __init__(
+        self,
+        persist_directory: str = Config.CHROMA_PATH,
+        base_collection: str = "multi_modal_rag",
+        bucket_size: int = Config.YEAR_PARTITION_SIZE,
+    ):
+        self.client = chromadb.PersistentClient(path=persist_directory)
+        self.base_collection = base_collection
+        self.bucket_size = bucket_size
+        self.prefix = f"{base_collection}__"
+
+    def collection_for_year(self, year) -> str:
+        """Return the name of the partition that stores PDFs of the given year."""
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            return self.prefix + UNKNOWN_PARTITION
+        start_year = year - year % self.bucket_size
+        return f"{self.prefix}{start_year}_{start_year + self.bucket_size - 1}"
+
+    def partition_bounds(self, name: str) -> Optional[Tuple[int, int]]:
+        """Return the (start_year, end_year) covered by a partition, or None for the unknown-year partition."""
+        suffix = name[len(self.prefix):]
+        try:
+            start_year, end_year = suffix.split("_")
+            return int(start_year), int(end_year)
+        except ValueError:
+            return None
+
+    def list_partitions(self) -> List[str]:
+        """Return the names of the existing partition collections."""
+        names = [
+            collection if isinstance(collection, str) else collection.name
+            for collection in self.client.list_collections()
+        ]
+        return sorted(name for name in names if name.startswith(self.prefix))
+
+    def partitions_for_range(
+        self, year_range: Optional[Tuple[int, int]] = None, partitions: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Return the partitions overlapping the (start_year, end_year) range, or all of them without a range.
+        `partitions` are the already listed partition names, if any.
+        """
+        if partitions is None:
+            partitions = self.list_partitions()
+        if year_range is None:
+            return partitions
+
+        start_year, end_year = year_range
+        selected = []
+        for name in partitions:
+            bounds = self.partition_bounds(name)
+            if bounds is not None and bounds[0] <= end_year and bounds[1] >= start_year:
+                selected.append(name)
+        return selected
+
+    def migrate(self, batch_size: int = 500, drop_source: bool = False) -> Dict[str, int]:
+        """Copy the single-collection store into year partitions. Returns the number of entries per partition."""
+        source = self.client.get_collection(name=self.base_collection)
+        counts = defaultdict(int)
+        offset = 0
+        while True:
+            batch = source.get(
+                include=["embeddings", "documents", "metadatas"], limit=batch_size, offset=offset
+            )
+            if len(batch["ids"]) == 0:
+                break
+
+            grouped = defaultdict(lambda: {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+            for i, entry_id in enumerate(batch["ids"]):
+                metadata = batch["metadatas"][i] or {}
+                group = grouped[self.collection_for_year(metadata.get("year"))]
+                group["ids"].append(entry_id)
+                group["embeddings"].append(batch["embeddings"][i])
+                group["documents"].append(batch["documents"][i])
+                group["metadatas"].append(batch["metadatas"][i])
+
+            for name, group in grouped.items():
+                self.client.get_or_create_collection(name=name).upsert(**group)
+                counts[name] += len(group["ids"])
+            offset += len(batch["ids"])
+
+        if drop_source:
+            self.client.delete_collection(name=self.base_collection)
+        return dict(counts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split the vector store into year partitions.")
+    parser.add_argument(
+        "--drop-source", action="store_true", help="Delete the single collection after copying."
+    )
+    args = parser.parse_args()
+
+    counts = YearPartitions().migrate(drop_source=args.drop_source)
+    for name, count in sorted(counts.items()):
+        print(f"{name}: {count} entries")
+    print(f"✅ Migrated {sum(counts.values())} entries into {len(counts)} partitions")